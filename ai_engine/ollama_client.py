@@ -3,6 +3,9 @@ import json
 
 OLLAMA_API = "http://localhost:11434/api/generate"
 
+# ✅ Shared session keeps the Ollama connection alive across calls (e.g. `main.py serve`)
+_session = requests.Session()
+
 def call_ollama(prompt: str, mode: str = "default") -> str:
     model_map = {
         "career": "mistral",      # for role/skill suggestions
@@ -16,7 +19,7 @@ def call_ollama(prompt: str, mode: str = "default") -> str:
     print(f"\n⚙️ Calling model: {model} | mode: {mode}\n")
 
     try:
-        response = requests.post(
+        response = _session.post(
             OLLAMA_API,
             json={
                 "model": model,
@@ -0,0 +1,223 @@
+"""
+Batch resume screening against one role.
+
+    python batch_analyze.py <resume_dir|manifest> [--goal ROLE] [--jd JD_PATH] [--output results.jsonl]
+
+The manifest is either a text file with one resume path per line or a JSONL
+file with a "resume_path" field per line. Text is extracted in parallel, NER
+runs through spaCy nlp.pipe, resume embeddings are encoded in batched MiniLM
+calls, and one JSON record per resume is appended to the output file.
+Re-running with the same output file skips resumes that already have a record.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Dict, Iterator, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # Ensure local imports
+
+from utils.config import logger, SKILL_EXTRACTION_MODE
+from utils.text_extraction import extract_text
+from utils.nlp_utils import extract_named_entities, extract_named_entities_batch, SKILL_EXTRACTION_MODES
+from utils.utils import load_skill_map
+from utils.comparator import calculate_fit_score
+from utils.role_suggestor import detect_role_from_jd
+from utils.embedding_store import encode_cached
+from utils.role_embeddings import load_role_matrix, encode_normalized
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+EMBED_CHARS = 4000  # Same resume prefix the summarizer sends to the LLM
+
+
+# ---------- Input discovery ----------
+def list_resumes(source: str) -> List[str]:
+    """Returns resume paths from a directory or a manifest file."""
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, files in os.walk(source)
+            for name in files
+            if name.lower().endswith(SUPPORTED_EXTENSIONS)
+        )
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            path = json.loads(line)["resume_path"] if line.startswith("{") else line
+            paths.append(path if os.path.isabs(path) else os.path.join(base, path))
+    return paths
+
+
+def load_completed(output_path: str) -> set:
+    """Resume paths already written to the output, dropping a half-written last line after a crash."""
+    if not os.path.exists(output_path):
+        return set()
+
+    with open(output_path, "rb") as f:
+        data = f.read()
+    if data and not data.endswith(b"\n"):
+        data = data[:data.rfind(b"\n") + 1]
+        with open(output_path, "wb") as f:
+            f.write(data)
+
+    completed = set()
+    for line in data.decode("utf-8").splitlines():
+        try:
+            completed.add(json.loads(line)["resume_path"])
+        except (ValueError, KeyError):
+            continue
+    return completed
+
+
+def chunked(items: List[str], size: int) -> Iterator[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# ---------- Scoring ----------
+def skill_gap(resume_skills: set, goal_data: Dict, jd_skills: set) -> Dict:
+    """Same skill comparison generate_recommendations performs for a single resume."""
+    must_have = goal_data.get("must_have", [])
+    optional = goal_data.get("optional", [])
+    required = set(s.lower() for s in set(must_have + optional).union(jd_skills))
+
+    return {
+        "matched_skills": sorted(resume_skills & required),
+        "missing_skills": sorted(required - resume_skills),
+        "optional_missing": sorted(set(s.lower() for s in optional) - resume_skills),
+        "fit_score": calculate_fit_score(list(resume_skills), must_have)
+    }
+
+
+def analyze_batch(paths: List[str], goal: str, goal_data: Dict, jd_skills: set, reference_embedding,
+                  role_names: List[str], role_embeddings, pool: ProcessPoolExecutor,
+                  batch_size: int, n_process: int, skill_mode: str, top_n: int = 3) -> List[Dict]:
+    texts = list(pool.map(extract_text, paths))
+
+    records = {}
+    valid = []
+    for path, text in zip(paths, texts):
+        if text.strip():
+            valid.append((path, text))
+        else:
+            records[path] = {"resume_path": path, "error": "Resume file is empty or invalid."}
+
+    if valid:
+        valid_texts = [text for _, text in valid]
+        ner_batch = extract_named_entities_batch(valid_texts, batch_size=batch_size,
+                                                 n_process=n_process, mode=skill_mode)
+        embeddings = encode_cached([text[:EMBED_CHARS] for text in valid_texts], batch_size=batch_size)
+        similarities = embeddings @ reference_embedding
+        role_scores = embeddings @ role_embeddings.T
+
+        for i, ((path, _), ner_results) in enumerate(zip(valid, ner_batch)):
+            resume_skills = set(s.lower() for s in ner_results.get("detected_skills", []))
+            ranked = [j for j in role_scores[i].argsort()[::-1] if role_names[j] != goal][:top_n]
+            records[path] = {
+                "resume_path": path,
+                "goal": goal,
+                **skill_gap(resume_skills, goal_data, jd_skills),
+                "semantic_similarity": round(float(similarities[i]) * 100, 2),
+                "alternate_roles": [
+                    {"role": role_names[j], "score": round(float(role_scores[i][j]) * 100, 2)}
+                    for j in ranked
+                ],
+                "ner_results": ner_results,
+                "name": ner_results.get("name", []),
+                "education": ner_results.get("education", []),
+                "certifications": ner_results.get("certifications", [])
+            }
+
+    return [records[path] for path in paths]
+
+
+# ---------- Runner ----------
+def run_batch(source: str, output_path: str, goal: Optional[str] = None, jd_path: Optional[str] = None,
+              chunk_size: int = 256, batch_size: int = 64, n_process: int = 1,
+              workers: int = os.cpu_count() or 1, skill_mode: str = SKILL_EXTRACTION_MODE) -> Dict:
+    skill_map = load_skill_map()
+    jd_text = extract_text(jd_path) if jd_path else None
+
+    if not goal and jd_text:
+        logger.info("No role provided. Detecting role from JD...")
+        goal = detect_role_from_jd(jd_text, skill_map)
+    elif not goal:
+        raise ValueError("Please provide either a target role or a job description.")
+
+    goal_data = skill_map.get(goal)
+    if not goal_data:
+        raise ValueError(f"Role '{goal}' not found in skill map.")
+
+    jd_skills = set()
+    if jd_text:
+        jd_ner = extract_named_entities(jd_text, mode=skill_mode)
+        jd_skills = set(s.lower() for s in jd_ner.get("detected_skills", []))
+
+    role_names, role_embeddings = load_role_matrix(skill_map)
+    reference_embedding = encode_normalized(jd_text[:EMBED_CHARS] if jd_text else goal)
+
+    all_paths = list_resumes(source)
+    completed = load_completed(output_path)
+    pending = [path for path in all_paths if path not in completed]
+    logger.info(f"📂 {len(all_paths)} resumes found, {len(completed)} already done, {len(pending)} to process.")
+
+    processed = 0
+    failed = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output_path, "a", encoding="utf-8") as out:
+        for paths in chunked(pending, chunk_size):
+            for record in analyze_batch(paths, goal, goal_data, jd_skills, reference_embedding,
+                                        role_names, role_embeddings, pool, batch_size, n_process, skill_mode):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                failed += "error" in record
+            out.flush()
+            os.fsync(out.fileno())
+
+            processed += len(paths)
+            elapsed = time.perf_counter() - start
+            logger.info(f"⏳ {processed}/{len(pending)} resumes ({processed / elapsed:.1f} docs/sec)")
+
+    elapsed = time.perf_counter() - start
+    report = {
+        "goal": goal,
+        "total": len(all_paths),
+        "skipped": len(completed),
+        "processed": processed,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "docs_per_sec": round(processed / elapsed, 2) if elapsed > 0 else 0.0
+    }
+    logger.info(f"✅ Batch finished: {json.dumps(report)}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch resume analysis against one role or JD")
+    parser.add_argument("source", help="Directory of resumes or manifest file (paths or JSONL)")
+    parser.add_argument("--goal", help="Target role from skill_map.json")
+    parser.add_argument("--jd", help="Job description file")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL output (appended, used to resume)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Resumes per checkpointed chunk")
+    parser.add_argument("--batch-size", type=int, default=64, help="spaCy / MiniLM batch size")
+    parser.add_argument("--n-process", type=int, default=1, help="spaCy nlp.pipe processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Text extraction processes")
+    parser.add_argument("--skill-mode", choices=SKILL_EXTRACTION_MODES, default=SKILL_EXTRACTION_MODE,
+                        help="gazetteer skips spaCy entirely for the fastest screening")
+    args = parser.parse_args()
+
+    try:
+        report = run_batch(args.source, args.output, args.goal, args.jd,
+                           args.chunk_size, args.batch_size, args.n_process, args.workers, args.skill_mode)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(f"❌ Error: {e}")
+
+    print(json.dumps(report, indent=2))
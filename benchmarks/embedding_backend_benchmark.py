@@ -0,0 +1,94 @@
+"""
+Benchmark: throughput, latency and accuracy drift of the MiniLM embedding backends.
+
+    python benchmarks/embedding_backend_benchmark.py [--backends torch torch-int8 onnx onnx-int8] [--k 5]
+
+Sentences are the lines of benchmarks/fixtures/resumes/*.txt; role names come
+from skill_map.json. For each backend it reports batched sentences/sec, p50 /
+p95 single-sentence latency, cosine drift against float32 torch (1 - cos
+between the two embeddings of each sentence) and role ranking drift (top-1
+agreement and top-k overlap when each fixture resume is ranked against
+every role). The embedding store is bypassed so every call hits the model.
+ONNX backends need `python -m utils.embedding_backends export` first.
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)  # Ensure local imports
+
+from utils.embedding_backends import EMBEDDING_BACKENDS, load_backend
+from utils.role_embeddings import top_k
+from utils.utils import load_skill_map
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "resumes")
+
+
+def percentile_ms(samples, pct) -> float:
+    return round(float(np.percentile(samples, pct)) * 1000, 3)
+
+
+def encode(model, texts, batch_size=32) -> np.ndarray:
+    return np.asarray(model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                   normalize_embeddings=True), dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MiniLM embedding backend benchmark")
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS), choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--k", type=int, default=5, help="Roles compared for ranking drift")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the sentences")
+    args = parser.parse_args()
+
+    resumes = [open(path, encoding="utf-8").read() for path in sorted(glob.glob(os.path.join(FIXTURES, "*.txt")))]
+    sentences = [line.strip() for text in resumes for line in text.splitlines() if line.strip()]
+    roles = list(load_skill_map().keys())
+    print(f"{len(sentences)} sentences, {len(resumes)} resumes, {len(roles)} roles\n")
+
+    reference = None
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        try:
+            model = load_backend(backend)
+        except Exception as e:
+            print(f"{backend:>10} | skipped: {e}")
+            continue
+
+        encode(model, sentences[:args.batch_size], args.batch_size)  # Warm-up
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            sentence_vectors = encode(model, sentences, args.batch_size)
+        throughput = len(sentences) * args.repeat / (time.perf_counter() - start)
+
+        latencies = []
+        for sentence in sentences:
+            t = time.perf_counter()
+            encode(model, [sentence])
+            latencies.append(time.perf_counter() - t)
+
+        role_vectors = encode(model, roles, args.batch_size)
+        rankings = [top_k(role_vectors @ query, args.k) for query in encode(model, resumes, args.batch_size)]
+
+        if reference is None:
+            reference = (sentence_vectors, rankings)
+            drift = "reference"
+        else:
+            ref_vectors, ref_rankings = reference
+            cos_drift = 1.0 - np.sum(sentence_vectors * ref_vectors, axis=1)
+            top1 = np.mean([r[0] == ref[0] for r, ref in zip(rankings, ref_rankings)])
+            overlap = np.mean([len(set(r) & set(ref)) / len(ref) for r, ref in zip(rankings, ref_rankings)])
+            drift = (f"cos drift mean {cos_drift.mean():.5f} max {cos_drift.max():.5f} | "
+                     f"top-1 agree {top1:.2f} | top-{args.k} overlap {overlap:.2f}")
+
+        if backend in args.backends:
+            print(f"{backend:>10} | {throughput:8.1f} sent/s | p50 {percentile_ms(latencies, 50)} ms | "
+                  f"p95 {percentile_ms(latencies, 95)} ms | {drift}")
+
+
+if __name__ == "__main__":
+    main()
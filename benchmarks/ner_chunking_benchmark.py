@@ -0,0 +1,106 @@
+"""
+Benchmark: whole-document NER vs chunked NER on 1-50 page inputs.
+
+    python benchmarks/ner_chunking_benchmark.py [--pages 1 5 10 25 50] [--chunk-chars N]
+
+Long inputs are synthesized by concatenating the fixture resumes until the
+target page count (PAGE_CHARS characters per page) is reached. Every
+(mode, pages) run happens in its own subprocess so peak RSS is isolated.
+Reports words/sec and peak memory, and whether both modes found the same skills.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)  # Ensure local imports
+
+CORPUS_DIR = os.path.join(ROOT, "benchmarks", "fixtures", "resumes")
+PAGE_CHARS = 3000  # Roughly one dense page of resume text
+MODES = ("whole", "chunked")
+
+
+def build_document(pages: int) -> str:
+    fixtures = []
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        with open(os.path.join(CORPUS_DIR, name), "r", encoding="utf-8") as f:
+            fixtures.append(f.read())
+
+    parts, size, i = [], 0, 0
+    while size < pages * PAGE_CHARS:
+        parts.append(fixtures[i % len(fixtures)])
+        size += len(parts[-1]) + 2
+        i += 1
+    return "\n\n".join(parts)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(mode: str, pages: int, chunk_chars: int) -> dict:
+    from utils.nlp_utils import extract_named_entities_chunked, entities_from_docs
+    from utils.model_registry import get_spacy_md, get_spacy_custom
+
+    text = build_document(pages)
+    nlp_md, nlp_custom = get_spacy_md(), get_spacy_custom()
+    # Lift spaCy's length guard so the whole-document baseline can run at all sizes
+    nlp_md.max_length = max(nlp_md.max_length, len(text) + 1)
+    if nlp_custom:
+        nlp_custom.max_length = max(nlp_custom.max_length, len(text) + 1)
+
+    rss_loaded = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "whole":
+        result = entities_from_docs(text, nlp_md(text), nlp_custom(text) if nlp_custom else None)
+    else:
+        result = extract_named_entities_chunked(text, max_chars=chunk_chars, mode="ner")
+    elapsed = time.perf_counter() - start
+
+    words = len(text.split())
+    return {
+        "mode": mode,
+        "pages": pages,
+        "words": words,
+        "seconds": round(elapsed, 3),
+        "words_per_sec": round(words / elapsed, 1) if elapsed > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "peak_above_models_mb": round(peak_rss_mb() - rss_loaded, 1),
+        "skills": result["detected_skills"]
+    }
+
+
+def spawn(mode: str, pages: int, chunk_chars: int) -> dict:
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", mode,
+           "--pages", str(pages), "--chunk-chars", str(chunk_chars)]
+    output = subprocess.run(cmd, check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whole-document vs chunked NER benchmark")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 10, 25, 50], help="Document sizes in pages")
+    parser.add_argument("--chunk-chars", type=int, default=10000, help="Max characters per chunk")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.pages[0], args.chunk_chars)))
+        return
+
+    print(f"{'pages':>5} | {'mode':>7} | {'words/sec':>10} | {'peak MB':>8} | {'+MB over models':>15} | same skills")
+    for pages in args.pages:
+        reports = {mode: spawn(mode, pages, args.chunk_chars) for mode in MODES}
+        same = reports["whole"]["skills"] == reports["chunked"]["skills"]
+        for mode, report in reports.items():
+            print(f"{pages:>5} | {mode:>7} | {report['words_per_sec']:>10} | {report['peak_rss_mb']:>8} | "
+                  f"{report['peak_above_models_mb']:>15} | {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
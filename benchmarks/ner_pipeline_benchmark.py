@@ -0,0 +1,111 @@
+"""
+Benchmark: full spaCy pipelines vs NER-only pipelines in extract_named_entities.
+
+    python benchmarks/ner_pipeline_benchmark.py [--corpus DIR] [--repeat N] [--batch-size N]
+
+Each mode runs in its own subprocess so peak RSS is measured in isolation:
+- full:     every en_core_web_md component, one nlp(text) call per document
+- ner-only: unused components removed, documents batched through nlp.pipe
+
+Reports words/sec and peak memory per mode and checks that the extracted
+skills, education, certifications and names are identical on the corpus.
+Exits non-zero if any document differs.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)  # Ensure local imports
+
+DEFAULT_CORPUS = os.path.join(ROOT, "benchmarks", "fixtures", "resumes")
+MODES = {"full": "0", "ner-only": "1"}
+
+
+def load_corpus(corpus_dir: str) -> dict:
+    texts = {}
+    for name in sorted(os.listdir(corpus_dir)):
+        with open(os.path.join(corpus_dir, name), "r", encoding="utf-8") as f:
+            texts[name] = f.read()
+    return texts
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_mode(mode: str, corpus_dir: str, repeat: int, batch_size: int) -> dict:
+    """Runs inside the child process; NER_ONLY_PIPELINES is already set by the parent."""
+    from utils.nlp_utils import extract_named_entities, extract_named_entities_batch
+    from utils.model_registry import get_spacy_md, get_spacy_custom
+
+    corpus = load_corpus(corpus_dir)
+    names = list(corpus)
+    texts = [corpus[name] for name in names] * repeat
+    words = sum(len(text.split()) for text in texts)
+
+    get_spacy_md()
+    get_spacy_custom()
+
+    start = time.perf_counter()
+    if mode == "full":
+        results = [extract_named_entities(text) for text in texts]
+    else:
+        results = extract_named_entities_batch(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "pipeline": get_spacy_md().pipe_names,
+        "documents": len(texts),
+        "words": words,
+        "seconds": round(elapsed, 3),
+        "words_per_sec": round(words / elapsed, 1) if elapsed > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "results": dict(zip(names, results[:len(names)]))
+    }
+
+
+def spawn(mode: str, args) -> dict:
+    env = dict(os.environ, NER_ONLY_PIPELINES=MODES[mode])
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", mode,
+           "--corpus", args.corpus, "--repeat", str(args.repeat), "--batch-size", str(args.batch_size)]
+    output = subprocess.run(cmd, env=env, check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs NER-only spaCy pipeline benchmark")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Directory of .txt fixture documents")
+    parser.add_argument("--repeat", type=int, default=50, help="Times the corpus is repeated for timing")
+    parser.add_argument("--batch-size", type=int, default=32, help="nlp.pipe batch size for ner-only mode")
+    parser.add_argument("--child", choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.corpus, args.repeat, args.batch_size), ensure_ascii=False))
+        return
+
+    reports = {mode: spawn(mode, args) for mode in MODES}
+    baseline, candidate = reports["full"]["results"], reports["ner-only"]["results"]
+    mismatches = [name for name in baseline if baseline[name] != candidate.get(name)]
+
+    for mode, report in reports.items():
+        print(f"{mode:>9}: {report['words_per_sec']:>10} words/sec | peak {report['peak_rss_mb']:>7} MB | "
+              f"pipeline {report['pipeline']}")
+    speedup = reports["ner-only"]["words_per_sec"] / max(reports["full"]["words_per_sec"], 1e-9)
+    print(f"  speedup: {speedup:.2f}x")
+
+    if mismatches:
+        print(f"❌ Entities differ for: {', '.join(mismatches)}")
+        sys.exit(1)
+    print(f"✅ Identical entities on all {len(baseline)} fixture documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: recall vs latency of the IVF role index against exact search.
+
+    python benchmarks/role_ann_benchmark.py [--roles 50000] [--queries 500] [--k 10] [--n-probe 1 4 8 16 32]
+
+By default it uses synthetic clustered unit vectors of MiniLM's width (384),
+sized like a large job-title taxonomy, so no model download is needed.
+Pass --skill-map to index the real skill_map.json role embeddings instead.
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)  # Ensure local imports
+
+from utils.role_ann_index import RoleANNIndex
+from utils.role_embeddings import top_k
+
+DIM = 384
+
+
+def synthetic_vectors(n: int, clusters: int, rng) -> np.ndarray:
+    centers = rng.normal(size=(clusters, DIM))
+    vectors = centers[rng.integers(clusters, size=n)] + 0.6 * rng.normal(size=(n, DIM))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def percentile_ms(samples, pct) -> float:
+    return round(float(np.percentile(samples, pct)) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF role index recall/latency benchmark")
+    parser.add_argument("--roles", type=int, default=50000, help="Synthetic catalog size")
+    parser.add_argument("--queries", type=int, default=500, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--n-lists", type=int, default=None, help="IVF lists (default sqrt(roles))")
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16, 32], help="Lists probed per query")
+    parser.add_argument("--skill-map", action="store_true", help="Use real skill_map.json role embeddings")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.skill_map:
+        from utils.utils import load_skill_map
+        from utils.role_embeddings import load_role_matrix
+        names, matrix = load_role_matrix(load_skill_map())
+        vectors = np.asarray(matrix)
+    else:
+        vectors = synthetic_vectors(args.roles, max(1, args.roles // 100), rng)
+        names = [f"role-{i}" for i in range(len(vectors))]
+
+    queries = vectors[rng.integers(len(vectors), size=args.queries)] + 0.3 * rng.normal(size=(args.queries, vectors.shape[1]))
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+    start = time.perf_counter()
+    index = RoleANNIndex.build(names, vectors, args.n_lists)
+    print(f"Built index over {len(index)} vectors in {len(index.centroids)} lists ({time.perf_counter() - start:.2f}s)")
+
+    exact, exact_times = [], []
+    for query in queries:
+        t = time.perf_counter()
+        exact.append(set(top_k(vectors @ query, args.k).tolist()))
+        exact_times.append(time.perf_counter() - t)
+    print(f"{'exact':>10} | recall@{args.k} 1.000 | p50 {percentile_ms(exact_times, 50)} ms | p95 {percentile_ms(exact_times, 95)} ms")
+
+    for n_probe in args.n_probe:
+        hits, times = 0, []
+        for query, truth in zip(queries, exact):
+            t = time.perf_counter()
+            found = index.search(query, args.k, n_probe)
+            times.append(time.perf_counter() - t)
+            hits += len(truth & {row for row, _ in found})
+        recall = hits / (len(queries) * args.k)
+        print(f"{'probe ' + str(n_probe):>10} | recall@{args.k} {recall:.3f} | "
+              f"p50 {percentile_ms(times, 50)} ms | p95 {percentile_ms(times, 95)} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@ import json
 import io
 import os
 import contextlib
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 # ✅ Force stdout to UTF-8 (still needed)
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -30,13 +33,19 @@ def read_input_from_stdin():
     except Exception as e:
         return {"error": f"Failed to parse stdin input: {str(e)}"}
 
+# ✅ Worker pool size for `main.py serve`
+SERVE_MAX_WORKERS = int(os.getenv("MAIN_SERVE_WORKERS", "8"))
+
 def process_request():
     if len(sys.argv) < 2:
         return {"error": "Usage: python main.py <mode>"}
 
     mode = sys.argv[1]
     payload = read_input_from_stdin()
+    return handle_mode(mode, payload)
 
+def handle_mode(mode: str, payload: dict) -> dict:
+    """Runs a single chatbot/interview action and returns its JSON response."""
     try:
         if mode == "decide-role":
             user_id = payload.get("user_id")
@@ -96,7 +105,72 @@ def process_request():
     except Exception as e:
         return {"error": str(e)}
 
+# ✅ Per-user locks so concurrent requests for one session don't interleave Redis writes
+_user_locks = defaultdict(threading.Lock)
+_user_locks_guard = threading.Lock()
+
+def get_user_lock(user_id: str) -> threading.Lock:
+    with _user_locks_guard:
+        return _user_locks[user_id]
+
+def handle_serve_line(line: str) -> dict:
+    """Parses one NDJSON request line and returns its framed response."""
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object.")
+    except Exception as e:
+        return {"id": None, "response": {"error": f"Failed to parse request: {str(e)}"}}
+
+    request_id = request.get("id")
+    mode = request.get("mode")
+    payload = request.get("payload")
+    if payload is None:
+        payload = {k: v for k, v in request.items() if k not in ("id", "mode")}
+
+    if not mode:
+        return {"id": request_id, "response": {"error": "Missing 'mode' in request."}}
+    if not isinstance(payload, dict):
+        return {"id": request_id, "response": {"error": "'payload' must be a JSON object."}}
+
+    with get_user_lock(str(payload.get("user_id", "default"))):
+        response = handle_mode(mode, payload)
+    return {"id": request_id, "response": response}
+
+def serve():
+    """
+    Long-running worker: reads one JSON request per line from stdin,
+    e.g. {"id": "42", "mode": "get-question", "payload": {...}},
+    and writes one JSON response per line to stdout: {"id": "42", "response": {...}}.
+    Requests run concurrently; responses are written as they complete.
+    """
+    out = sys.stdout
+    write_lock = threading.Lock()
+
+    def respond(future):
+        try:
+            framed = future.result()
+        except Exception as e:
+            framed = {"id": None, "response": {"error": str(e)}}
+        line = json.dumps(framed, ensure_ascii=False)
+        with write_lock:
+            out.write(line + "\n")
+            out.flush()
+
+    # ✅ Internal prints must never reach the response stream
+    with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sink):
+        with ThreadPoolExecutor(max_workers=SERVE_MAX_WORKERS) as pool:
+            for raw in sys.stdin.buffer:
+                line = raw.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                pool.submit(handle_serve_line, line).add_done_callback(respond)
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve()
+        return
+
     # ✅ Suppress all other internal prints
     with contextlib.redirect_stdout(io.StringIO()):
         response = process_request()
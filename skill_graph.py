@@ -2,122 +2,257 @@ import os
 import sys
 import json
 import asyncio
-from typing import Optional
+import contextlib
+from functools import partial
+from typing import AsyncIterator, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # Ensure local imports
 
-from utils.config import logger
+from utils.config import logger, SKILL_GRAPH_CONCURRENCY, SKILL_DAG_OUTPUT, RESULT_CACHE_ENABLED
 from utils.text_extraction import extract_text
 from utils.summarizer import summarize_resume
 from utils.nlp_utils import extract_named_entities
 from utils.utils import load_skill_map
 from utils.comparator import calculate_fit_score
-from utils.graph_builder import build_graph_nodes_and_edges
-from utils.role_suggestor import detect_role_from_jd, get_alternate_roles_with_descriptions
-from utils.learning_project_generator import generate_learning_and_projects
-
-
-async def generate_recommendations(resume_text: str, jd_text: Optional[str] = None, goal: Optional[str] = None):
-    skill_map = load_skill_map()
-    summary = summarize_resume(resume_text)
-
-    # 🧠 Detect goal if not provided
-    if not goal and jd_text:
-        logger.info("No role provided. Detecting role from JD...")
-        goal = detect_role_from_jd(jd_text, skill_map)
-    elif not goal:
-        logger.warning("Neither role nor JD provided. Cannot proceed.")
-        return {"error": "Please provide either a target role or a job description."}
-
-    goal_data = skill_map.get(goal)
-    if not goal_data:
-        return {"error": f"Role '{goal}' not found in skill map."}
-
-    # 📊 Extract skill data from goal
-    must_have = goal_data.get("must_have", [])
-    optional = goal_data.get("optional", [])
-    role_skills = set(must_have + optional)
-
-    # 📥 Extract JD skills via NER (if JD provided)
-    jd_skills = set()
-    if jd_text:
-        jd_ner = extract_named_entities(jd_text)
-        jd_skills = set(s.lower() for s in jd_ner.get("detected_skills", []))
-
-    # Combine goal and JD skills
-    combined_required_skills = set(s.lower() for s in role_skills.union(jd_skills))
-
-    # 📥 Resume skill extraction via custom NER
-    ner_results = extract_named_entities(resume_text)
-    resume_skills = set(s.lower() for s in ner_results.get("detected_skills", []))
-
-    matched_skills = sorted(list(resume_skills & combined_required_skills))
-    missing_skills = sorted(list(combined_required_skills - resume_skills))
-    optional_missing = sorted(list(set(s.lower() for s in optional) - resume_skills))
-    recommended_skills = sorted(set(missing_skills + optional_missing))
-
-    # 🔄 Generate learning paths and project ideas
-    learning_path = []
-    project_ideas = {}
-
-    for skill in recommended_skills:
-        logger.info(f"Generating learning path and project ideas for: {skill}")
+from utils.graph_builder import build_graph_nodes_and_edges, get_description, get_prerequisites, prefetch_metadata
+from utils.role_suggestor import detect_role_from_jd, get_alternate_roles, get_role_description
+from utils.learning_project_generator import generate_learning_and_projects, load_many_from_cache
+from utils.skill_dependencies import get_skill_dag
+from utils.result_cache import environment_fingerprint, invalidate_if_stale, cache_key, get_cached_result, store_result
+
+
+def _learning_content(skill: str) -> Optional[Dict]:
+    logger.info(f"Generating learning path and project ideas for: {skill}")
+    try:
+        result = generate_learning_and_projects(skill)
+        if not result or not isinstance(result, dict):
+            logger.warning(f"⚠️ Invalid or empty result for {skill}")
+            return None
+        return result
+    except Exception as e:
+        logger.warning(f"❌ Failed to generate content for {skill}: {e}")
+        return None
+
+
+def _cached_learning_content(skills) -> Dict[str, Dict]:
+    try:
+        return load_many_from_cache(skills)
+    except Exception as e:
+        logger.warning(f"⚠️ Content cache unavailable: {e}")
+        return {}
+
+
+# Key order of the merged generate_recommendations document
+RESULT_KEYS = [
+    "goal", "matched_skills", "missing_skills", "optional_missing", "recommended_skills",
+    "learning_path", "project_ideas", "fit_score", "graph", "job_skills", "ner_results",
+    "resume_summary", "alternate_roles", "name", "education", "certifications"
+]
+
+
+async def stream_recommendations(resume_text: str, jd_text: Optional[str] = None, goal: Optional[str] = None,
+                                 concurrency: int = SKILL_GRAPH_CONCURRENCY,
+                                 use_cache: bool = RESULT_CACHE_ENABLED) -> AsyncIterator[Dict]:
+    """
+    Yields partial result dicts as each section is ready; merging them gives
+    the generate_recommendations output. A cached result for the same inputs
+    is yielded whole, and complete new results are written to the cache.
+    """
+    key = None
+    if use_cache:
         try:
-            result = generate_learning_and_projects(skill)
-            if not result or not isinstance(result, dict):
-                logger.warning(f"⚠️ Invalid or empty result for {skill}")
-                continue
-
-            lp = result.get("learning_path", [])
-            pi = result.get("project_ideas", [])
-
-            if lp:
-                learning_path.append({
-                    "skill": skill,
-                    "steps": lp
-                })
-            if pi:
-                project_ideas[skill] = pi[:3]
+            fingerprint = environment_fingerprint()
+            invalidate_if_stale(fingerprint)
+            key = cache_key(resume_text, jd_text, goal, fingerprint)
+            cached = get_cached_result(key)
+        except Exception as e:
+            logger.warning(f"⚠️ Result cache unavailable: {e}")
+            key, cached = None, None
+        if cached is not None:
+            logger.info("⚡ Returning cached analysis result.")
+            yield cached
+            return
 
+    merged = {}
+    async for section in _analysis_sections(resume_text, jd_text, goal, concurrency):
+        merged.update(section)
+        yield section
+
+    # Don't pin errors or a failed summary in the cache
+    if key and "error" not in merged and not merged.get("resume_summary", "").startswith("⚠️"):
+        try:
+            store_result(key, {k: merged[k] for k in RESULT_KEYS})
         except Exception as e:
-            logger.warning(f"❌ Failed to generate content for {skill}: {e}")
-
-    # 🧠 Final response
-    fit_score = calculate_fit_score(list(resume_skills), must_have)
-    graph = build_graph_nodes_and_edges(matched_skills, missing_skills)
-    alternate_roles = get_alternate_roles_with_descriptions(summary, goal, skill_map)
-
-    return {
-        "goal": goal,
-        "matched_skills": matched_skills,
-        "missing_skills": missing_skills,
-        "optional_missing": optional_missing,
-        "recommended_skills": recommended_skills,
-        "learning_path": learning_path,
-        "project_ideas": project_ideas,
-        "fit_score": fit_score,
-        "graph": graph,
-        "job_skills": sorted(list(jd_skills)) if jd_text else None,
-        "ner_results": ner_results,
-        "resume_summary": summary,
-        "alternate_roles": [
-            {"role": role, "score": score, "description": description}
-            for (role, score, description) in alternate_roles
-        ],
-        "name": ner_results.get("name", []),
-        "education": ner_results.get("education", []),
-        "certifications": ner_results.get("certifications", [])
-    }
+            logger.warning(f"⚠️ Could not cache analysis result: {e}")
+
+
+async def _analysis_sections(resume_text: str, jd_text: Optional[str], goal: Optional[str],
+                             concurrency: int) -> AsyncIterator[Dict]:
+    """
+    Runs the full resume analysis. Blocking stages (NER, LLM calls) run on a
+    thread pool of `concurrency` workers so independent stages overlap. On
+    failure a single {"error": ...} dict is yielded.
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    def run(func, *args):
+        return loop.run_in_executor(executor, partial(func, *args))
+
+    try:
+        skill_map = load_skill_map()
+        summary_task = run(summarize_resume, resume_text)
+
+        # 🧠 Detect goal if not provided
+        if not goal and jd_text:
+            logger.info("No role provided. Detecting role from JD...")
+            goal = await run(detect_role_from_jd, jd_text, skill_map)
+        elif not goal:
+            logger.warning("Neither role nor JD provided. Cannot proceed.")
+            yield {"error": "Please provide either a target role or a job description."}
+            return
+
+        goal_data = skill_map.get(goal)
+        if not goal_data:
+            yield {"error": f"Role '{goal}' not found in skill map."}
+            return
+
+        yield {"goal": goal}
+
+        # 📊 Extract skill data from goal
+        must_have = goal_data.get("must_have", [])
+        optional = goal_data.get("optional", [])
+        role_skills = set(must_have + optional)
+
+        # 📥 Resume and JD skill extraction via NER
+        resume_ner_task = run(extract_named_entities, resume_text)
+        jd_skills = set()
+        if jd_text:
+            jd_ner = await run(extract_named_entities, jd_text)
+            jd_skills = set(s.lower() for s in jd_ner.get("detected_skills", []))
+        ner_results = await resume_ner_task
+
+        # Combine goal and JD skills
+        combined_required_skills = set(s.lower() for s in role_skills.union(jd_skills))
+        resume_skills = set(s.lower() for s in ner_results.get("detected_skills", []))
+
+        matched_skills = sorted(list(resume_skills & combined_required_skills))
+        missing_skills = sorted(list(combined_required_skills - resume_skills))
+        optional_missing = sorted(list(set(s.lower() for s in optional) - resume_skills))
+        recommended_skills = sorted(set(missing_skills + optional_missing))
+
+        # ⚡ Local results are ready long before the LLM-backed sections
+        yield {
+            "matched_skills": matched_skills,
+            "missing_skills": missing_skills,
+            "optional_missing": optional_missing,
+            "recommended_skills": recommended_skills,
+            "fit_score": calculate_fit_score(list(resume_skills), must_have),
+            "job_skills": sorted(list(jd_skills)) if jd_text else None,
+            "ner_results": ner_results,
+            "name": ner_results.get("name", []),
+            "education": ner_results.get("education", []),
+            "certifications": ner_results.get("certifications", [])
+        }
+
+        # 🔄 Fan out learning content, graph metadata and role descriptions
+        async def learning_stage():
+            # SKILL_DAG_OUTPUT: prerequisites first, per the skill_map.json dependency DAG
+            dag = get_skill_dag() if SKILL_DAG_OUTPUT else None
+            ordered_skills = dag.sort_skills(recommended_skills) if dag is not None else recommended_skills
+            # One batched cache read; only the misses go to the generator
+            cached = await run(_cached_learning_content, ordered_skills)
+            results = await asyncio.gather(*(
+                asyncio.sleep(0, cached[skill]) if skill in cached else run(_learning_content, skill)
+                for skill in ordered_skills
+            ))
+            learning_path = []
+            project_ideas = {}
+            for skill, result in zip(ordered_skills, results):
+                if not result:
+                    continue
+                lp = result.get("learning_path", [])
+                pi = result.get("project_ideas", [])
+                if lp:
+                    entry = {
+                        "skill": skill,
+                        "steps": lp
+                    }
+                    if dag is not None:
+                        entry["prerequisites"] = dag.prerequisites_of(skill, known=resume_skills)
+                    learning_path.append(entry)
+                if pi:
+                    project_ideas[skill] = pi[:3]
+            return {"learning_path": learning_path, "project_ideas": project_ideas}
+
+        async def graph_stage():
+            graph_skills = sorted(set(matched_skills + missing_skills))
+            await run(prefetch_metadata, graph_skills)
+            # Only skills the batched prompts could not fill still make requests here
+            await asyncio.gather(
+                *(run(get_description, skill) for skill in graph_skills),
+                *(run(get_prerequisites, skill) for skill in graph_skills)
+            )
+            # Metadata is cached now, so this only assembles nodes and edges
+            return {"graph": build_graph_nodes_and_edges(matched_skills, missing_skills)}
+
+        async def summary_stage():
+            return {"resume_summary": await summary_task}
+
+        async def alternate_roles_stage():
+            summary = await summary_task
+            roles = await run(get_alternate_roles, summary, goal, skill_map)
+            descriptions = await asyncio.gather(*(run(get_role_description, role) for role, _ in roles))
+            return {
+                "alternate_roles": [
+                    {"role": role, "score": score, "description": description}
+                    for (role, score), description in zip(roles, descriptions)
+                ]
+            }
+
+        stages = [learning_stage(), graph_stage(), summary_stage(), alternate_roles_stage()]
+        for next_section in asyncio.as_completed(stages):
+            yield await next_section
+    finally:
+        executor.shutdown(wait=False)
+
+
+async def generate_recommendations(resume_text: str, jd_text: Optional[str] = None, goal: Optional[str] = None,
+                                   concurrency: int = SKILL_GRAPH_CONCURRENCY,
+                                   use_cache: bool = RESULT_CACHE_ENABLED):
+    merged = {}
+    async for section in stream_recommendations(resume_text, jd_text, goal, concurrency, use_cache):
+        if "error" in section:
+            return section
+        merged.update(section)
+    return {key: merged[key] for key in RESULT_KEYS}
+
+
+async def write_ndjson_stream(resume_text: str, jd_text: Optional[str] = None, goal: Optional[str] = None,
+                              use_cache: bool = RESULT_CACHE_ENABLED) -> None:
+    """Writes each partial section to stdout as one JSON line as soon as it is ready."""
+    out = sys.stdout.buffer
+    # ✅ Internal prints (worker threads included) must never land between the JSON lines
+    with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sink):
+        async for section in stream_recommendations(resume_text, jd_text, goal, use_cache=use_cache):
+            out.write((json.dumps(section, ensure_ascii=False) + "\n").encode("utf-8"))
+            out.flush()
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        logger.error("Usage: python skill_graph.py <resume_path> [<goal>] [<jd_path>]")
+    args = sys.argv[1:]
+    stream = "--stream" in args
+    use_cache = RESULT_CACHE_ENABLED and "--no-cache" not in args
+    args = [a for a in args if a not in ("--stream", "--no-cache")]
+
+    if len(args) < 1:
+        logger.error("Usage: python skill_graph.py <resume_path> [<goal>] [<jd_path>] [--stream] [--no-cache]")
         sys.exit(1)
 
-    resume_path = sys.argv[1]
-    goal = sys.argv[2] if len(sys.argv) > 2 else None
-    jd_path = sys.argv[3] if len(sys.argv) > 3 else None
+    resume_path = args[0]
+    goal = args[1] if len(args) > 1 else None
+    jd_path = args[2] if len(args) > 2 else None
 
     resume_text = extract_text(resume_path)
     if not resume_text.strip():
@@ -126,5 +261,9 @@ if __name__ == "__main__":
 
     jd_text = extract_text(jd_path) if jd_path else None
 
-    result = asyncio.run(generate_recommendations(resume_text, jd_text, goal))
-    sys.stdout.buffer.write(json.dumps(result, indent=2, ensure_ascii=False).encode("utf-8"))
+    if stream:
+        asyncio.run(write_ndjson_stream(resume_text, jd_text, goal, use_cache))
+    else:
+        with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sink):
+            result = asyncio.run(generate_recommendations(resume_text, jd_text, goal, use_cache=use_cache))
+        sys.stdout.buffer.write(json.dumps(result, indent=2, ensure_ascii=False).encode("utf-8"))
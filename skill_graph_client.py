@@ -0,0 +1,85 @@
+"""
+Client for skill_graph_server.py with the same CLI contract as skill_graph.py:
+
+    python skill_graph_client.py <resume_path> [<goal>] [<jd_path>]
+
+Writes the generate_recommendations JSON to stdout. If no server is listening
+it falls back to running the analysis in-process.
+"""
+import os
+import sys
+import json
+import struct
+import socket
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # Ensure local imports
+
+from utils.config import logger, SKILL_GRAPH_SOCKET_PATH
+
+FRAME_HEADER = struct.Struct("!Q")  # Same length prefix as skill_graph_server.py
+
+
+def request_analysis(resume_path: str, goal: str = None, jd_path: str = None,
+                     socket_path: str = SKILL_GRAPH_SOCKET_PATH) -> dict:
+    """Sends one analysis request to the prefork server and returns its JSON result."""
+    request = {
+        "resume_path": os.path.abspath(resume_path),
+        "goal": goal,
+        "jd_path": os.path.abspath(jd_path) if jd_path else None
+    }
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    data = b"".join(chunks)
+    if len(data) < FRAME_HEADER.size:
+        return {"error": "Analysis server closed the connection without a response."}
+    (length,) = FRAME_HEADER.unpack_from(data)
+    body = data[FRAME_HEADER.size:]
+    if len(body) != length:
+        return {"error": "Analysis worker crashed while sending its response."}
+    return json.loads(body.decode("utf-8"))
+
+
+def analyze_in_process(resume_path: str, goal: str = None, jd_path: str = None) -> dict:
+    """Fallback when the server is down: same pipeline as skill_graph.py."""
+    from utils.text_extraction import extract_text
+    from skill_graph import generate_recommendations
+
+    resume_text = extract_text(resume_path)
+    if not resume_text.strip():
+        return {"error": "Resume file is empty or invalid."}
+
+    jd_text = extract_text(jd_path) if jd_path else None
+    return asyncio.run(generate_recommendations(resume_text, jd_text, goal))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        logger.error("Usage: python skill_graph_client.py <resume_path> [<goal>] [<jd_path>]")
+        sys.exit(1)
+
+    resume_path = sys.argv[1]
+    goal = sys.argv[2] if len(sys.argv) > 2 else None
+    jd_path = sys.argv[3] if len(sys.argv) > 3 else None
+
+    try:
+        result = request_analysis(resume_path, goal, jd_path)
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        logger.warning(f"⚠️ Skill graph server unavailable ({e}). Running analysis in-process.")
+        result = analyze_in_process(resume_path, goal, jd_path)
+
+    if result.get("error") == "Resume file is empty or invalid.":
+        logger.error("Resume is empty or unreadable.")
+        sys.exit("❌ Error: Resume file is empty or invalid.")
+
+    sys.stdout.buffer.write(json.dumps(result, indent=2, ensure_ascii=False).encode("utf-8"))
@@ -0,0 +1,195 @@
+"""
+Pre-forking analysis server for skill_graph.generate_recommendations.
+
+The parent process loads every NLP model once, then forks one worker per
+resume analysis so all workers share the model weights copy-on-write.
+A crashing worker only fails its own request; the parent keeps serving.
+
+Unix only (relies on os.fork and Unix domain sockets).
+
+Usage:
+    python skill_graph_server.py [--socket PATH] [--max-workers N]
+
+Protocol: the client sends one JSON line
+    {"resume_path": "...", "goal": "...", "jd_path": "..."}
+and reads one frame: an 8-byte big-endian length, then that many bytes of
+JSON (the generate_recommendations result). A frame cut short by EOF means
+the worker died while replying.
+"""
+import os
+import sys
+import gc
+import json
+import mmap
+import struct
+import signal
+import socket
+import select
+import asyncio
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # Ensure local imports
+
+from utils.config import logger, SKILL_GRAPH_SOCKET_PATH, SKILL_GRAPH_MAX_WORKERS
+from utils.text_extraction import extract_text
+from utils.nlp_utils import extract_named_entities
+from utils.model_registry import preload_all, load_report
+from skill_graph import generate_recommendations
+
+_running = True
+FRAME_HEADER = struct.Struct("!Q")  # Response length prefix
+
+
+def frame(response: dict) -> bytes:
+    body = json.dumps(response, ensure_ascii=False).encode("utf-8")
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+# ---------- Worker side ----------
+def read_request(conn: socket.socket) -> dict:
+    """Reads a single newline-terminated JSON request from the client."""
+    buffer = b""
+    while b"\n" not in buffer:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        buffer += chunk
+    return json.loads(buffer.split(b"\n", 1)[0].decode("utf-8"))
+
+
+def analyze(request: dict) -> dict:
+    resume_path = request.get("resume_path")
+    if not resume_path:
+        return {"error": "Missing 'resume_path' in request."}
+
+    resume_text = extract_text(resume_path)
+    if not resume_text.strip():
+        return {"error": "Resume file is empty or invalid."}
+
+    jd_path = request.get("jd_path")
+    jd_text = extract_text(jd_path) if jd_path else None
+    return asyncio.run(generate_recommendations(resume_text, jd_text, request.get("goal")))
+
+
+def run_worker(conn: socket.socket, replying: mmap.mmap) -> None:
+    """Entry point of a forked worker. Never returns. `replying` (shared with the parent) is set before any byte is sent."""
+    exit_code = 0
+    try:
+        try:
+            result = analyze(read_request(conn))
+        except Exception as e:
+            logger.error(f"❌ Worker {os.getpid()} failed: {e}")
+            result = {"error": str(e)}
+        response = frame(result)
+        replying[0] = 1
+        conn.sendall(response)
+        conn.shutdown(socket.SHUT_WR)
+    except Exception as e:
+        logger.error(f"❌ Worker {os.getpid()} could not reply: {e}")
+        exit_code = 1
+    finally:
+        conn.close()
+        os._exit(exit_code)
+
+
+# ---------- Parent side ----------
+def preload_models() -> None:
+    """Loads and warms the models in the parent so forked workers inherit them."""
+    logger.info("⏳ Preloading NLP models in parent process...")
+    preload_all()
+    extract_named_entities("Python developer with Docker and SQL experience.")
+    # Move everything allocated so far out of the GC's reach so collections
+    # in the workers don't touch (and copy) the shared pages.
+    gc.freeze()
+    logger.info(f"✅ Models loaded ({load_report()['total_rss_mb']} MB RSS). Ready to fork workers.")
+
+
+def finish_worker(workers: dict, pid: int, status: int) -> None:
+    conn, replying = workers.pop(pid, (None, None))
+    if conn is None:
+        return
+    if os.WIFSIGNALED(status) or os.WEXITSTATUS(status) != 0:
+        reason = f"signal {os.WTERMSIG(status)}" if os.WIFSIGNALED(status) else f"exit code {os.WEXITSTATUS(status)}"
+        logger.error(f"❌ Worker {pid} crashed ({reason})")
+        # After a partial frame the client sees the short read; appending would corrupt it
+        if not replying[0]:
+            try:
+                conn.sendall(frame({"error": f"Analysis worker crashed ({reason})."}))
+            except OSError:
+                pass
+    conn.close()
+    replying.close()
+
+
+def reap_workers(workers: dict, block: bool = False) -> None:
+    while workers:
+        pid, status = os.waitpid(-1, 0 if block else os.WNOHANG)
+        if pid == 0:
+            return
+        finish_worker(workers, pid, status)
+        if block:
+            return
+
+
+def stop(signum, frame):
+    global _running
+    _running = False
+
+
+def serve(socket_path: str = SKILL_GRAPH_SOCKET_PATH, max_workers: int = SKILL_GRAPH_MAX_WORKERS) -> None:
+    preload_models()
+
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(64)
+    logger.info(f"🚀 Skill graph server listening on {socket_path} (max {max_workers} workers)")
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    workers = {}
+    try:
+        while _running:
+            reap_workers(workers)
+            if len(workers) >= max_workers:
+                reap_workers(workers, block=True)
+                continue
+
+            try:
+                ready, _, _ = select.select([server], [], [], 0.5)
+            except InterruptedError:
+                continue
+            if not ready:
+                continue
+
+            conn, _ = server.accept()
+            replying = mmap.mmap(-1, 1)  # Anonymous shared page: survives the fork
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                run_worker(conn, replying)
+
+            # Keep the parent's handle so it can report a crashed worker to the client
+            workers[pid] = (conn, replying)
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        logger.info(f"⏳ Waiting for {len(workers)} running worker(s)...")
+        while workers:
+            reap_workers(workers, block=True)
+        logger.info("👋 Skill graph server stopped.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-forking skill graph analysis server")
+    parser.add_argument("--socket", default=SKILL_GRAPH_SOCKET_PATH, help="Unix socket path to listen on")
+    parser.add_argument("--max-workers", type=int, default=SKILL_GRAPH_MAX_WORKERS, help="Maximum concurrent analyses")
+    args = parser.parse_args()
+    serve(args.socket, args.max_workers)
@@ -2,28 +2,19 @@ import os
 import asyncio
 import json
 from utils.config import logger
+from utils.content_store import get_content_store, skill_key
 
 # GPTQ CLI script path
 GPTQ_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gptq_api.py")
 
-# Local skill-wise cache directory
-CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache")
-os.makedirs(CACHE_DIR, exist_ok=True)
-
 # ---------------------
-# Cache helpers
+# Cache helpers (shared content store)
 # ---------------------
 def load_from_cache(skill: str, mode: str):
-    path = os.path.join(CACHE_DIR, f"{skill.replace(' ', '_').lower()}_{mode}.json")
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return None
+    return get_content_store().get(mode, skill_key(skill))
 
 def save_to_cache(skill: str, mode: str, data):
-    path = os.path.join(CACHE_DIR, f"{skill.replace(' ', '_').lower()}_{mode}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    get_content_store().put(mode, skill_key(skill), data)
 
 # ---------------------
 # GPTQ subprocess runner
@@ -0,0 +1,193 @@
+"""
+Candidate ranking index: many stored resumes versus one JD.
+
+Each candidate's extracted skills go into a skill -> candidates inverted
+index and its MiniLM embedding into one normalized matrix, so a JD is
+scored against every candidate without touching the raw resumes again.
+The score blends skill overlap (share of JD skills the candidate has) with
+embedding cosine similarity.
+
+    python -m utils.candidate_index add <candidate_id> <resume_path>
+    python -m utils.candidate_index remove <candidate_id>
+    python -m utils.candidate_index search <jd_path> [--k 10]
+"""
+import os
+import json
+import argparse
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.config import CANDIDATE_INDEX_DIR, CANDIDATE_SKILL_WEIGHT, logger
+from utils.nlp_utils import extract_named_entities
+from utils.role_embeddings import encode_normalized, top_k
+
+EMBED_CHARS = 4000  # Same resume prefix the summarizer sends to the LLM
+INDEX_FILE = "index.npz"  # Embeddings + candidate list, replaced together in one rename
+
+
+def resume_skills(text: str) -> List[str]:
+    return sorted(set(s.lower() for s in extract_named_entities(text).get("detected_skills", [])))
+
+
+class CandidateIndex:
+    def __init__(self):
+        self.ids: List[Optional[str]] = []      # row -> candidate id (None once removed)
+        self.rows: Dict[str, int] = {}          # candidate id -> row
+        self.skills: List[List[str]] = []       # row -> skills
+        self.inverted: Dict[str, set] = defaultdict(set)  # skill -> rows
+        self.embeddings = np.empty((0, 0), np.float32)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    # ---------- Updates ----------
+    def add(self, candidate_id: str, resume_text: Optional[str] = None, skills: Optional[List[str]] = None,
+            embedding: Optional[np.ndarray] = None) -> None:
+        """Adds or replaces a candidate. Skills / embedding are computed from resume_text when not given."""
+        if skills is None or embedding is None:
+            if resume_text is None:
+                raise ValueError("resume_text is required when skills or embedding are not provided.")
+            skills = resume_skills(resume_text) if skills is None else skills
+            embedding = encode_normalized(resume_text[:EMBED_CHARS]) if embedding is None else embedding
+
+        if candidate_id in self.rows:
+            self.remove(candidate_id)
+
+        embedding = np.asarray(embedding, np.float32)
+        self._reserve(embedding.shape[0])
+        row = self._size
+        self.embeddings[row] = embedding
+        self._size += 1
+
+        skills = sorted(set(s.strip().lower() for s in skills))
+        self.ids.append(candidate_id)
+        self.skills.append(skills)
+        self.rows[candidate_id] = row
+        for skill in skills:
+            self.inverted[skill].add(row)
+
+    def remove(self, candidate_id: str) -> bool:
+        row = self.rows.pop(candidate_id, None)
+        if row is None:
+            return False
+        for skill in self.skills[row]:
+            self.inverted[skill].discard(row)
+            if not self.inverted[skill]:
+                del self.inverted[skill]
+        self.ids[row] = None
+        self.skills[row] = []
+        self.embeddings[row] = 0.0  # Removed rows can never score above live ones on similarity
+        return True
+
+    def _reserve(self, dim: int) -> None:
+        """Grows the embedding matrix by doubling so repeated adds stay amortized O(1)."""
+        if self.embeddings.shape[1] != dim:
+            if self._size:
+                raise ValueError(f"Embedding width {dim} does not match index width {self.embeddings.shape[1]}.")
+            self.embeddings = np.zeros((16, dim), np.float32)
+        if self._size == len(self.embeddings):
+            grown = np.zeros((max(16, 2 * len(self.embeddings)), dim), np.float32)
+            grown[:self._size] = self.embeddings[:self._size]
+            self.embeddings = grown
+
+    # ---------- Query ----------
+    def search(self, jd_text: str, k: int = 10, skill_weight: float = CANDIDATE_SKILL_WEIGHT,
+               jd_skills: Optional[List[str]] = None) -> List[Dict]:
+        """Top-k candidates for a JD by skill_weight * skill overlap + (1 - skill_weight) * similarity."""
+        if not self.rows:
+            return []
+
+        jd_skills = sorted(set(s.lower() for s in jd_skills)) if jd_skills is not None else resume_skills(jd_text)
+        similarity = self.embeddings[:self._size] @ encode_normalized(jd_text[:EMBED_CHARS])
+
+        overlap_counts = np.zeros(self._size, np.float32)
+        for skill in jd_skills:
+            for row in self.inverted.get(skill, ()):
+                overlap_counts[row] += 1
+        overlap = overlap_counts / len(jd_skills) if jd_skills else overlap_counts
+
+        scores = skill_weight * overlap + (1 - skill_weight) * similarity
+        live = np.array([candidate is not None for candidate in self.ids])
+        scores[~live] = -np.inf
+
+        results = []
+        for row in top_k(scores, min(k, len(self.rows))):
+            matched = [s for s in jd_skills if row in self.inverted.get(s, ())]
+            results.append({
+                "candidate_id": self.ids[row],
+                "score": round(float(scores[row]) * 100, 2),
+                "skill_overlap": round(float(overlap[row]) * 100, 2),
+                "similarity": round(float(similarity[row]) * 100, 2),
+                "matched_skills": matched,
+                "missing_skills": [s for s in jd_skills if s not in matched]
+            })
+        return results
+
+    # ---------- Persistence ----------
+    def save(self, directory: str = CANDIDATE_INDEX_DIR) -> None:
+        """Writes live candidates (removed rows are compacted away) as one file, swapped in atomically."""
+        os.makedirs(directory, exist_ok=True)
+        live_rows = [row for row, candidate in enumerate(self.ids) if candidate is not None]
+        embeddings = self.embeddings[live_rows] if live_rows else np.empty((0, self.embeddings.shape[1]), np.float32)
+        candidates = json.dumps([{"id": self.ids[row], "skills": self.skills[row]} for row in live_rows],
+                                ensure_ascii=False)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, embeddings=embeddings, candidates=np.array(candidates))
+            os.replace(tmp_path, os.path.join(directory, INDEX_FILE))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, directory: str = CANDIDATE_INDEX_DIR) -> "CandidateIndex":
+        index = cls()
+        path = os.path.join(directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return index
+
+        with np.load(path, allow_pickle=False) as data:
+            embeddings = data["embeddings"]
+            candidates = json.loads(str(data["candidates"]))
+
+        if len(candidates) != len(embeddings):
+            raise ValueError(f"Candidate index in {directory} is inconsistent: "
+                             f"{len(candidates)} candidates but {len(embeddings)} embeddings.")
+        for candidate, embedding in zip(candidates, embeddings):
+            index.add(candidate["id"], skills=candidate["skills"], embedding=embedding)
+        logger.info(f"✅ Loaded candidate index with {len(index)} candidates from {directory}")
+        return index
+
+
+if __name__ == "__main__":
+    from utils.text_extraction import extract_text
+
+    parser = argparse.ArgumentParser(description="Candidate ranking index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add_cmd = sub.add_parser("add", help="Add or replace a candidate")
+    add_cmd.add_argument("candidate_id")
+    add_cmd.add_argument("resume_path")
+    remove_cmd = sub.add_parser("remove", help="Remove a candidate")
+    remove_cmd.add_argument("candidate_id")
+    search_cmd = sub.add_parser("search", help="Rank candidates against a JD")
+    search_cmd.add_argument("jd_path")
+    search_cmd.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    index = CandidateIndex.load()
+    if args.command == "add":
+        index.add(args.candidate_id, extract_text(args.resume_path))
+        index.save()
+    elif args.command == "remove":
+        if not index.remove(args.candidate_id):
+            logger.warning(f"⚠️ Candidate {args.candidate_id} not found.")
+        index.save()
+    else:
+        print(json.dumps(index.search(extract_text(args.jd_path), args.k), indent=2, ensure_ascii=False))
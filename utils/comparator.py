@@ -1,5 +1,9 @@
+import json
+import hashlib
 from typing import List, Dict
 
+import numpy as np
+
 def calculate_fit_score(resume_skills: List[str], must_have: List[str]) -> str:
     """
     Calculates how many must-have skills the resume covers as a percentage.
@@ -34,3 +38,102 @@ def get_skill_gaps(resume_skills: List[str], must_have: List[str], optional: Lis
         "optional_missing": sorted(list(optional_set - resume_set)),
         "covered": sorted(list(resume_set & must_have_set))
     }
+
+
+# ---------- Vectorized multi-role scoring ----------
+
+class RoleSkillMatrix:
+    """
+    skill_map.json compiled into sparse role x skill matrices over one
+    canonical (stripped, lowercased) skill vocabulary.
+    """
+
+    def __init__(self, skill_map: Dict[str, Dict]):
+        from scipy.sparse import csr_matrix
+
+        self.roles = list(skill_map.keys())
+        self.vocab: Dict[str, int] = {}
+
+        def rows(field: str):
+            indptr, indices = [0], []
+            for role in self.roles:
+                columns = {self.vocab.setdefault(skill.strip().lower(), len(self.vocab))
+                           for skill in skill_map[role].get(field, [])}
+                indices.extend(sorted(columns))
+                indptr.append(len(indices))
+            return indptr, indices
+
+        must_ptr, must_idx = rows("must_have")
+        opt_ptr, opt_idx = rows("optional")
+        shape = (len(self.roles), len(self.vocab))
+        self.must_have = csr_matrix((np.ones(len(must_idx), np.float32), must_idx, must_ptr), shape=shape)
+        self.optional = csr_matrix((np.ones(len(opt_idx), np.float32), opt_idx, opt_ptr), shape=shape)
+        self.must_counts = np.diff(self.must_have.indptr)
+        self.optional_counts = np.diff(self.optional.indptr)
+        self.skills = sorted(self.vocab, key=self.vocab.get)
+
+    def skill_vector(self, resume_skills: List[str]) -> np.ndarray:
+        vector = np.zeros(len(self.vocab), np.float32)
+        for skill in resume_skills:
+            column = self.vocab.get(skill.strip().lower())
+            if column is not None:
+                vector[column] = 1.0
+        return vector
+
+    def score(self, resume_skills: List[str]) -> Dict[str, np.ndarray]:
+        """Must-have / optional matches and coverage for every role at once."""
+        vector = self.skill_vector(resume_skills)
+        must_matched = self.must_have @ vector
+        optional_matched = self.optional @ vector
+        with np.errstate(divide="ignore", invalid="ignore"):
+            must_coverage = np.where(self.must_counts > 0, must_matched / self.must_counts, 0.0)
+            optional_coverage = np.where(self.optional_counts > 0, optional_matched / self.optional_counts, 0.0)
+        return {
+            "vector": vector,
+            "must_matched": must_matched,
+            "optional_matched": optional_matched,
+            "must_coverage": must_coverage,
+            "optional_coverage": optional_coverage
+        }
+
+    def missing(self, matrix, row: int, vector: np.ndarray) -> List[str]:
+        columns = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+        return sorted(self.skills[c] for c in columns if not vector[c])
+
+
+_role_skill_matrices: Dict[str, RoleSkillMatrix] = {}
+
+
+def get_role_skill_matrix(skill_map: Dict[str, Dict]) -> RoleSkillMatrix:
+    """Compiled matrix for `skill_map`, reused while its contents are unchanged."""
+    key = hashlib.sha256(json.dumps(skill_map, sort_keys=True).encode("utf-8")).hexdigest()
+    if key not in _role_skill_matrices:
+        _role_skill_matrices.clear()
+        _role_skill_matrices[key] = RoleSkillMatrix(skill_map)
+    return _role_skill_matrices[key]
+
+
+def rank_roles_by_skills(resume_skills: List[str], skill_map: Dict[str, Dict], top_n: int = 5) -> List[Dict]:
+    """
+    Best-fit roles by skill coverage, scoring every role in one sparse product.
+    Ranked by must-have coverage, then optional coverage. fit_score matches
+    calculate_fit_score for the same role.
+    """
+    matrix = get_role_skill_matrix(skill_map)
+    scores = matrix.score(resume_skills)
+    must_coverage, optional_coverage = scores["must_coverage"], scores["optional_coverage"]
+
+    # lexsort sorts by the last key first
+    order = np.lexsort((-optional_coverage, -must_coverage))[:top_n]
+
+    return [
+        {
+            "role": matrix.roles[i],
+            "fit_score": f"{round(must_coverage[i] * 100)}%",
+            "must_have_coverage": round(float(must_coverage[i]) * 100, 2),
+            "optional_coverage": round(float(optional_coverage[i]) * 100, 2),
+            "missing_skills": matrix.missing(matrix.must_have, i, scores["vector"]),
+            "optional_missing": matrix.missing(matrix.optional, i, scores["vector"])
+        }
+        for i in order
+    ]
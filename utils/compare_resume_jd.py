@@ -1,12 +1,10 @@
-import spacy
-from sentence_transformers import SentenceTransformer, util
-from typing import Dict
-from utils.config import CUSTOM_MODEL_PATH, logger
-from utils.nlp_utils import extract_named_entities
+from typing import Dict, List
 
-# ---------- Load models only once ----------
-model = SentenceTransformer("all-MiniLM-L6-v2")
-nlp = spacy.load(CUSTOM_MODEL_PATH)
+import numpy as np
+
+from utils.config import logger
+from utils.nlp_utils import extract_named_entities, extract_named_entities_batch
+from utils.role_embeddings import encode_normalized
 
 # ---------- Skill extraction from custom model ----------
 def get_skills(text: str) -> set:
@@ -15,9 +13,8 @@ def get_skills(text: str) -> set:
 
 # ---------- Embedding-based similarity ----------
 def compare_embeddings(text1: str, text2: str) -> float:
-    emb1 = model.encode(text1, convert_to_tensor=True)
-    emb2 = model.encode(text2, convert_to_tensor=True)
-    score = util.cos_sim(emb1, emb2).item()
+    emb1, emb2 = encode_normalized([text1, text2])
+    score = float(emb1 @ emb2)
     return round(score * 100, 2)
 
 
@@ -42,3 +39,48 @@ def analyze_resume_vs_jd_text(resume_text: str, jd_text: str) -> Dict:
         "matched_skills": matched_skills,
         "missing_skills": missing_skills
     }
+
+
+# ---------- Resume vs many JDs ----------
+def analyze_resume_vs_jds_text(resume_text: str, jd_texts: List[str], batch_size: int = 32) -> List[Dict]:
+    """
+    Batched analyze_resume_vs_jd_text for one resume against many JDs.
+    The resume is extracted and encoded once. All JDs go through one batched
+    encode call (cached JDs are skipped) and one nlp.pipe pass. Similarities and skill matches for every JD
+    come from a single matrix product each.
+    """
+    logger.info(f"🔍 Comparing resume against {len(jd_texts)} job descriptions...")
+    if not jd_texts:
+        return []
+
+    resume_skills = get_skills(resume_text)
+    resume_embedding = encode_normalized(resume_text)
+    jd_embeddings = encode_normalized(jd_texts)
+    full_text_similarity = jd_embeddings @ resume_embedding
+
+    jd_skill_sets = [
+        sorted(set(s.lower() for s in ner.get("detected_skills", [])))
+        for ner in extract_named_entities_batch(jd_texts, batch_size=batch_size)
+    ]
+
+    # JD x skill incidence matrix over every skill any JD asks for
+    vocab = {skill: i for i, skill in enumerate(sorted(set().union(*jd_skill_sets)))}
+    jd_matrix = np.zeros((len(jd_texts), len(vocab)), np.float32)
+    for row, skills in enumerate(jd_skill_sets):
+        jd_matrix[row, [vocab[s] for s in skills]] = 1.0
+    resume_vector = np.zeros(len(vocab), np.float32)
+    resume_vector[[vocab[s] for s in resume_skills if s in vocab]] = 1.0
+
+    matched_counts = jd_matrix @ resume_vector
+    jd_counts = jd_matrix.sum(axis=1)
+
+    results = []
+    for row, skills in enumerate(jd_skill_sets):
+        matched = [s for s in skills if resume_vector[vocab[s]]]
+        results.append({
+            "full_text_similarity": round(float(full_text_similarity[row]) * 100, 2),
+            "skill_similarity": round(float(matched_counts[row]) / float(jd_counts[row]) * 100, 2) if jd_counts[row] else 0.0,
+            "matched_skills": matched,
+            "missing_skills": [s for s in skills if not resume_vector[vocab[s]]]
+        })
+    return results
@@ -12,6 +12,112 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 # ---------- Path Constants ----------
 CUSTOM_MODEL_PATH = os.path.join(BASE_DIR, "output", "model-best")
 SKILL_MAP_PATH = os.path.join(BASE_DIR, "skill_map.json")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+GAZETTEER_PATH = os.path.join(CACHE_DIR, "skill_gazetteer.json")
+ROLE_EMBEDDINGS_DIR = os.path.join(CACHE_DIR, "role_embeddings")
+ROLE_ANN_DIR = os.path.join(CACHE_DIR, "role_ann")
+EMBEDDING_STORE_DIR = os.path.join(CACHE_DIR, "embeddings")
+CANDIDATE_INDEX_DIR = os.getenv("CANDIDATE_INDEX_DIR", os.path.join(CACHE_DIR, "candidate_index"))
+
+# ---------- Model Names ----------
+SPACY_MD_MODEL = "en_core_web_md"
+SENTENCE_MODEL_NAME = "all-MiniLM-L6-v2"
+# Optional local directory with the SentenceTransformer files (no hub download)
+SENTENCE_MODEL_PATH = os.getenv("SENTENCE_MODEL_PATH", "").strip() or None
+# MiniLM runtime: "torch" (float32), "torch-int8", "onnx" or "onnx-int8" (see utils/embedding_backends.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_OFFLINE = os.getenv("EMBEDDING_OFFLINE", "0") == "1"
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(BASE_DIR, "models", "minilm-onnx"))
+# Vectors from different backends differ slightly, so caches are namespaced by both
+EMBEDDING_MODEL_ID = f"{SENTENCE_MODEL_NAME}-{EMBEDDING_BACKEND}"
+# Strip spaCy pipelines down to NER (only doc.ents is used)
+NER_ONLY_PIPELINES = os.getenv("NER_ONLY_PIPELINES", "1") != "0"
+# Skill extraction: "ner" (spaCy only), "gazetteer" (skill_map phrase index only) or "merged"
+SKILL_EXTRACTION_MODE = os.getenv("SKILL_EXTRACTION_MODE", "ner")
+# Texts longer than NER_CHUNK_THRESHOLD chars run through NER in chunks of NER_CHUNK_CHARS
+NER_CHUNK_THRESHOLD = int(os.getenv("NER_CHUNK_THRESHOLD", "100000"))
+NER_CHUNK_CHARS = int(os.getenv("NER_CHUNK_CHARS", "10000"))
+
+# ---------- Prefork analysis server ----------
+SKILL_GRAPH_SOCKET_PATH = os.getenv("SKILL_GRAPH_SOCKET", os.path.join(CACHE_DIR, "skill_graph.sock"))
+SKILL_GRAPH_MAX_WORKERS = int(os.getenv("SKILL_GRAPH_MAX_WORKERS", "4"))
+
+# ---------- Analysis fan-out ----------
+# Max blocking stages (NER, LLM calls) run at once inside generate_recommendations
+SKILL_GRAPH_CONCURRENCY = int(os.getenv("SKILL_GRAPH_CONCURRENCY", "8"))
+
+# ---------- Skill graph metadata ----------
+# Descriptions / prerequisites fetched from LLMs persist here across runs
+GRAPH_METADATA_CACHE_PATH = os.path.join(CACHE_DIR, "graph_metadata.json")
+# skill_map.json dependencies compiled into a DAG (rebuilt when they change)
+SKILL_DAG_PATH = os.path.join(CACHE_DIR, "skill_dag.json")
+# Opt-in output: learning_path in DAG order with "prerequisites" per entry, graph nodes with "level"
+SKILL_DAG_OUTPUT = os.getenv("SKILL_DAG_OUTPUT", "0") == "1"
+# Build graphs from skill_map.json and the cache only, never calling an LLM
+SKILL_GRAPH_OFFLINE = os.getenv("SKILL_GRAPH_OFFLINE", "0") == "1"
+# Skills per batched description + prerequisites prompt (0 = one request per skill and field)
+GRAPH_METADATA_BATCH_SIZE = int(os.getenv("GRAPH_METADATA_BATCH_SIZE", "20"))
+# Extra attempts for skills whose entry in a batched answer was missing or malformed
+GRAPH_METADATA_BATCH_RETRIES = int(os.getenv("GRAPH_METADATA_BATCH_RETRIES", "1"))
+
+# ---------- Role search ----------
+# Approximate (IVF) role search for large role / title catalogs
+ROLE_ANN_ENABLED = os.getenv("ROLE_ANN_ENABLED", "0") == "1"
+ROLE_ANN_NPROBE = int(os.getenv("ROLE_ANN_NPROBE", "8"))
+
+# Weight of skill overlap vs embedding similarity when ranking candidates for a JD
+CANDIDATE_SKILL_WEIGHT = float(os.getenv("CANDIDATE_SKILL_WEIGHT", "0.6"))
+
+# ---------- Embedding store ----------
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") != "0"
+EMBEDDING_STORE_MAX_ENTRIES = int(os.getenv("EMBEDDING_STORE_MAX_ENTRIES", "100000"))
+EMBEDDING_STORE_DTYPE = os.getenv("EMBEDDING_STORE_DTYPE", "float32")  # or float16 to halve disk / RAM
+
+# ---------- Generated content cache ----------
+# Learning paths / project ideas (learning_project_generator, async_generator)
+CONTENT_CACHE_PATH = os.path.join(CACHE_DIR, "content.sqlite")
+CONTENT_CACHE_TTL = int(os.getenv("CONTENT_CACHE_TTL", str(30 * 24 * 3600)))  # seconds, 0 = never expire
+CONTENT_CACHE_MAX_ENTRIES = int(os.getenv("CONTENT_CACHE_MAX_ENTRIES", "50000"))
+
+# ---------- Analysis result cache ----------
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") != "0"
+RESULT_CACHE_DIR = os.path.join(CACHE_DIR, "results")
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "2000"))
+
+# ---------- LLM client ----------
+# Providers in preference order (live health stats reorder them)
+LLM_PROVIDERS = [p.strip() for p in os.getenv("LLM_PROVIDERS", "openrouter,gemini").split(",") if p.strip()]
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "3.05"))  # seconds
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "30"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))  # calls per chat(), across providers
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "16"))  # keep-alive connections per provider host
+# Circuit breaker: open after N consecutive failures, allow a trial call after the cooldown
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+# Requests per minute per provider, e.g. "openrouter=60,gemini=30" (unset = unlimited)
+LLM_RATE_LIMITS = {
+    name.strip(): float(limit)
+    for name, _, limit in (item.partition("=") for item in os.getenv("LLM_RATE_LIMITS", "").split(","))
+    if name.strip() and limit.strip()
+}
+# Hedged requests: if the primary provider is slower than its LLM_HEDGE_PERCENTILE latency,
+# also ask the next provider and take the first valid answer
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "0") == "1"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))  # seconds, floor for the hedge deadline
+LLM_HEDGE_COLD_DELAY = float(os.getenv("LLM_HEDGE_COLD_DELAY", "5.0"))  # deadline before latency history exists
+LLM_HEDGE_MAX_RATE = float(os.getenv("LLM_HEDGE_MAX_RATE", "0.2"))  # at most this share of calls hedge
+
+# ---------- Single-flight generation ----------
+# Concurrent cache misses for the same skill / role share one LLM generation; across
+# workers too, through flock files in SINGLE_FLIGHT_LOCK_DIR
+SINGLE_FLIGHT_CROSS_PROCESS = os.getenv("SINGLE_FLIGHT_CROSS_PROCESS", "1") != "0"
+SINGLE_FLIGHT_LOCK_DIR = os.path.join(CACHE_DIR, "locks")
+SINGLE_FLIGHT_LOCK_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_LOCK_TIMEOUT", "120"))  # seconds to wait on another worker
+
 HF_API_KEY = os.getenv("HF_API_KEY", "").strip()
 
 # ---------- Logger Setup ----------
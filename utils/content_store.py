@@ -0,0 +1,223 @@
+"""
+Transactional store for generated skill content (learning paths, project ideas).
+
+One SQLite file (.cache/content.sqlite, WAL mode) replaces the per-skill JSON
+files that learning_project_generator and async_generator used to write.
+Entries are (namespace, key) -> JSON value. Upserts are atomic, so
+concurrent workers never see half-written entries. get_many() reads a whole
+list of skills in one query. Entries expire after CONTENT_CACHE_TTL seconds,
+and the least recently used ones are evicted beyond CONTENT_CACHE_MAX_ENTRIES.
+
+The first time a store is opened, the legacy files in .cache are imported:
+    .cache/<skill>/<mode>.json   (learning_project_generator)
+    .cache/<skill>_<mode>.json   (async_generator: learning / projects)
+
+    python -m utils.content_store stats | migrate | clear
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.config import CACHE_DIR, CONTENT_CACHE_PATH, CONTENT_CACHE_TTL, CONTENT_CACHE_MAX_ENTRIES, logger
+
+EVICT_EVERY = 64  # Writes between eviction passes
+LEGACY_FLAT_FILE = re.compile(r"^(?P<key>.+)_(?P<mode>learning|projects)\.json$")
+
+
+def skill_key(skill: str) -> str:
+    """Same normalization as the legacy cache file names."""
+    return skill.strip().replace(" ", "_").lower()
+
+
+class ContentStore:
+    def __init__(self, path: str = CONTENT_CACHE_PATH, ttl: int = CONTENT_CACHE_TTL,
+                 max_entries: int = CONTENT_CACHE_MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "namespace TEXT, key TEXT, value TEXT, created REAL, last_used REAL, PRIMARY KEY (namespace, key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+
+    def _fresh_after(self) -> float:
+        return time.time() - self.ttl if self.ttl > 0 else 0.0
+
+    # ---------- Reads ----------
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        return self.get_many(namespace, [key]).get(key)
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """Unexpired values for whichever keys are present, in one query per 500 keys."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, value FROM entries WHERE namespace = ? AND created >= ? "
+                    f"AND key IN ({','.join('?' * len(chunk))})",
+                    [namespace, self._fresh_after(), *chunk]
+                ).fetchall()
+                for key, value in rows:
+                    try:
+                        found[key] = json.loads(value)
+                    except json.JSONDecodeError:
+                        logger.warning(f"⚠️ Corrupted cache entry {namespace}/{key}")
+            if found:
+                # One write transaction for all hits (autocommit would commit once per key)
+                now = time.time()
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    self._db.executemany("UPDATE entries SET last_used = ? WHERE namespace = ? AND key = ?",
+                                         [(now, namespace, key) for key in found])
+                    self._db.execute("COMMIT")
+                except Exception:
+                    self._db.execute("ROLLBACK")
+                    raise
+        return found
+
+    # ---------- Writes ----------
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        self.put_many(namespace, {key: value})
+
+    def put_many(self, namespace: str, items: Dict[str, Any]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(namespace, key, json.dumps(value, ensure_ascii=False), now, now) for key, value in items.items()]
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?) ON CONFLICT (namespace, key) "
+                    "DO UPDATE SET value = excluded.value, created = excluded.created, last_used = excluded.last_used",
+                    rows
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._writes += len(rows)
+            if self._writes >= EVICT_EVERY:
+                self._writes = 0
+                self._evict()
+
+    def _evict(self) -> None:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            if self.ttl > 0:
+                self._db.execute("DELETE FROM entries WHERE created < ?", (self._fresh_after(),))
+            overflow = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries ORDER BY last_used LIMIT ?)",
+                    (overflow,)
+                )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def evict(self) -> None:
+        """Drops expired entries, then the least recently used ones beyond max_entries."""
+        with self._lock:
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._db.execute("SELECT namespace, COUNT(*) FROM entries GROUP BY namespace").fetchall())
+
+    # ---------- Legacy cache migration ----------
+    def migrate_legacy(self, cache_dir: str = CACHE_DIR, force: bool = False) -> int:
+        """Imports the old per-skill JSON files once. The files are left in place."""
+        with self._lock:
+            done = self._db.execute("SELECT value FROM meta WHERE name = 'legacy_migrated'").fetchone()
+        if done and not force:
+            return 0
+
+        imported: Dict[str, Dict[str, Any]] = {}
+
+        def load(path: str) -> Optional[Any]:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"⚠️ Skipping unreadable legacy cache file {path}: {e}")
+                return None
+
+        for name in (os.listdir(cache_dir) if os.path.isdir(cache_dir) else []):
+            path = os.path.join(cache_dir, name)
+            flat = LEGACY_FLAT_FILE.match(name)
+            legacy_file = os.path.join(path, "learning_and_projects.json")
+            if os.path.isfile(legacy_file):
+                value = load(legacy_file)
+                if value is not None:
+                    imported.setdefault("learning_and_projects", {})[name] = value
+            elif flat and os.path.isfile(path):
+                value = load(path)
+                if value is not None:
+                    imported.setdefault(flat.group("mode"), {})[flat.group("key")] = value
+
+        count = 0
+        for namespace, items in imported.items():
+            # Never overwrite content generated since
+            existing = self.get_many(namespace, items)
+            fresh = {key: value for key, value in items.items() if key not in existing}
+            self.put_many(namespace, fresh)
+            count += len(fresh)
+
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('legacy_migrated', ?)", (str(time.time()),))
+        if count:
+            logger.info(f"✅ Migrated {count} legacy cache entries into {self.path}")
+        return count
+
+
+_store: Optional[ContentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_content_store() -> ContentStore:
+    """Shared store; the legacy .cache files are migrated on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            store = ContentStore()
+            try:
+                store.migrate_legacy()
+            except Exception as e:
+                logger.warning(f"⚠️ Legacy cache migration failed: {e}")
+            _store = store
+        return _store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generated content cache")
+    parser.add_argument("command", choices=["stats", "migrate", "clear"])
+    args = parser.parse_args()
+
+    store = get_content_store()
+    if args.command == "migrate":
+        print(f"Imported {store.migrate_legacy(force=True)} entries")
+    elif args.command == "clear":
+        store.clear()
+    print(json.dumps(store.stats(), indent=2))
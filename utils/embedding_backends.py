@@ -0,0 +1,133 @@
+"""
+CPU embedding backends for all-MiniLM-L6-v2.
+
+EMBEDDING_BACKEND selects what get_sentence_model() returns:
+- torch:      float32 SentenceTransformer (default)
+- torch-int8: the same model with its Linear layers dynamically quantized to int8
+- onnx:       ONNX Runtime export of the same weights
+- onnx-int8:  int8-quantized ONNX export
+
+Every backend exposes the SentenceTransformer `encode` call the project uses
+(str or list input, batch_size, convert_to_numpy, normalize_embeddings).
+ONNX backends only read local files; create them once with:
+
+    python -m utils.embedding_backends export [--output models/minilm-onnx]
+"""
+import os
+import argparse
+from typing import List, Union
+
+import numpy as np
+
+from utils.config import (
+    EMBEDDING_BACKEND, EMBEDDING_OFFLINE, ONNX_MODEL_DIR, SENTENCE_MODEL_NAME, SENTENCE_MODEL_PATH, logger
+)
+
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2's sentence-transformers setting
+ONNX_FILES = {"onnx": "model.onnx", "onnx-int8": "model_int8.onnx"}
+
+
+def _offline() -> None:
+    if EMBEDDING_OFFLINE:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+
+def load_torch_model(quantize: bool = False):
+    _offline()
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(SENTENCE_MODEL_PATH or SENTENCE_MODEL_NAME, device="cpu")
+    if quantize:
+        import torch
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+class OnnxSentenceEncoder:
+    """Mean-pooled MiniLM sentence embeddings from an ONNX Runtime session."""
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, file_name: str = "model.onnx"):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        path = os.path.join(model_dir, file_name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found. Run `python -m utils.embedding_backends export` first.")
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **_) -> np.ndarray:
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            tokens = self.tokenizer(sentences[start:start + batch_size], padding=True, truncation=True,
+                                    max_length=MAX_SEQ_LENGTH, return_tensors="np")
+            feeds = {name: value.astype(np.int64) for name, value in tokens.items() if name in self.input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(embeddings.astype(np.float32))
+
+        embeddings = np.concatenate(batches) if batches else np.empty((0, self.dimension), np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+def load_backend(backend: str = EMBEDDING_BACKEND):
+    """Sentence encoder for `backend` (see EMBEDDING_BACKENDS)."""
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'. Use one of: {', '.join(EMBEDDING_BACKENDS)}")
+    if backend in ONNX_FILES:
+        return OnnxSentenceEncoder(ONNX_MODEL_DIR, ONNX_FILES[backend])
+    return load_torch_model(quantize=backend == "torch-int8")
+
+
+def export_onnx(output_dir: str = ONNX_MODEL_DIR) -> None:
+    """Exports the float32 model to ONNX plus an int8-quantized copy, with its tokenizer."""
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    model = load_torch_model()
+    transformer = model[0].auto_model
+    tokenizer = model[0].tokenizer
+    transformer.config.return_dict = False
+    transformer.eval()
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, ONNX_FILES["onnx"])
+    sample = tokenizer(["SkillSageX exports MiniLM"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic = {"batch": 0, "sequence": 1}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, tuple(sample[name] for name in names), path,
+            input_names=names, output_names=["last_hidden_state"],
+            dynamic_axes={**{name: dynamic for name in names}, "last_hidden_state": dynamic},
+            opset_version=14
+        )
+    tokenizer.save_pretrained(output_dir)
+    quantize_dynamic(path, os.path.join(output_dir, ONNX_FILES["onnx-int8"]), weight_type=QuantType.QInt8)
+    logger.info(f"✅ Exported ONNX MiniLM (float32 and int8) to {output_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MiniLM embedding backends")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_cmd = sub.add_parser("export", help="Export ONNX float32 + int8 models for offline use")
+    export_cmd.add_argument("--output", default=ONNX_MODEL_DIR)
+    args = parser.parse_args()
+    export_onnx(args.output)
@@ -0,0 +1,257 @@
+"""
+Persistent MiniLM embedding store keyed by text hash.
+
+Vectors live in one memory-mapped file per model namespace
+(.cache/embeddings/<namespace>/vectors.<dtype>) with a fixed number of
+slots. A small SQLite table maps sha256(text) -> slot and tracks last use;
+when the store is full, the least recently used slots are reused. Several
+processes can share a store. Slots are reserved in one SQLite write
+transaction, which also drops the keys of reused slots. The vectors are then
+written and flushed, and a second transaction publishes the new keys. A
+reader keeps a vector only if its key still maps to the same slot after the
+copy.
+
+encode_cached() is the entry point: it looks up a batch of texts and runs
+the transformer only on the misses.
+"""
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.config import (
+    EMBEDDING_STORE_DIR, EMBEDDING_STORE_MAX_ENTRIES, EMBEDDING_STORE_DTYPE,
+    EMBEDDING_CACHE_ENABLED, EMBEDDING_MODEL_ID, logger
+)
+from utils.model_registry import get_sentence_model
+
+
+PENDING_PREFIX = "pending:"  # Reserved slots whose vector is still being written
+PENDING_TIMEOUT = 300  # Seconds before an unpublished reservation counts as abandoned
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    def __init__(self, namespace: str, directory: str = EMBEDDING_STORE_DIR,
+                 capacity: int = EMBEDDING_STORE_MAX_ENTRIES, dtype: str = EMBEDDING_STORE_DTYPE):
+        self.directory = os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]+", "_", namespace))
+        os.makedirs(self.directory, exist_ok=True)
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+
+        self._db = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=30,
+                                   check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER UNIQUE, last_used REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+
+        meta = dict(self._db.execute("SELECT name, value FROM meta").fetchall())
+        # An existing store keeps the capacity / dtype it was created with
+        self.capacity = int(meta.get("capacity", capacity))
+        self.dim = int(meta["dim"]) if "dim" in meta else None
+        if "dtype" in meta:
+            self.dtype = np.dtype(meta["dtype"])
+
+    # ---------- Vector file ----------
+    def _open_vectors(self, dim: Optional[int] = None) -> Optional[np.memmap]:
+        if self._vectors is not None:
+            return self._vectors
+        if self.dim is None:
+            if dim is None:
+                return None
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany("INSERT OR IGNORE INTO meta VALUES (?, ?)", [
+                    ("dim", str(dim)), ("capacity", str(self.capacity)), ("dtype", self.dtype.name)
+                ])
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self.dim = int(self._db.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()[0])
+
+        path = os.path.join(self.directory, f"vectors.{self.dtype.name}")
+        size = self.capacity * self.dim * self.dtype.itemsize
+        if not os.path.exists(path) or os.path.getsize(path) < size:
+            # Created under the write lock, so a file another process just filled is never truncated
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if not os.path.exists(path):
+                    # Sparse file: disk is only used for slots that get written
+                    fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                    try:
+                        os.ftruncate(fd, size)
+                    finally:
+                        os.close(fd)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        self._vectors = np.memmap(path, dtype=self.dtype, mode="r+", shape=(self.capacity, self.dim))
+        return self._vectors
+
+    # ---------- Lookups ----------
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Stored vectors (as float32) for whichever keys are present."""
+        if not keys:
+            return {}
+        with self._lock:
+            vectors = self._open_vectors()
+            if vectors is None:
+                return {}
+            found = {}
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._slots(chunk)
+                copies = {key: np.array(vectors[slot], dtype=np.float32) for key, slot in rows}
+                # A slot reused by another process while it was copied has lost its key by now
+                current = dict(self._slots(list(copies)))
+                found.update({key: copies[key] for key, slot in rows if current.get(key) == slot})
+            if found:
+                self._touch(list(found))
+            return found
+
+    def _touch(self, keys: List[str]) -> None:
+        """Marks keys as used in one write transaction (autocommit would commit once per key)."""
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in keys])
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _slots(self, keys: List[str]) -> List[tuple]:
+        if not keys:
+            return []
+        return self._db.execute(
+            f"SELECT key, slot FROM entries WHERE key IN ({','.join('?' * len(keys))})", keys
+        ).fetchall()
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        if not items:
+            return
+        with self._lock:
+            dim = len(next(iter(items.values())))
+            vectors = self._open_vectors(dim)
+
+            # 1. Reserve slots under placeholder keys; reused slots lose their old key in the same commit
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                keys = [key for key in items if not self._db.execute(
+                    "SELECT 1 FROM entries WHERE key IN (?, ?)", (key, PENDING_PREFIX + key)
+                ).fetchone()]
+                keys = keys[:self.capacity]
+                slots = self._allocate(len(keys))
+                now = time.time()
+                self._db.executemany("INSERT INTO entries VALUES (?, ?, ?)",
+                                     [(PENDING_PREFIX + key, slot, now) for key, slot in zip(keys, slots)])
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            if not keys:
+                return
+
+            # 2. Write outside any transaction: no reader can reach these slots yet
+            for key, slot in zip(keys, slots):
+                vectors[slot] = np.asarray(items[key], dtype=self.dtype)
+            vectors.flush()
+
+            # 3. Publish. Placeholders left by a failure here are reclaimed as least recently used
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany("UPDATE entries SET key = ? WHERE key = ?",
+                                     [(key, PENDING_PREFIX + key) for key in keys])
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _allocate(self, count: int) -> List[int]:
+        """Free slots first, then the least recently used ones (their keys are dropped)."""
+        used = self._db.execute("SELECT COUNT(*), COALESCE(MAX(slot), -1) FROM entries").fetchone()
+        slots = []
+        if used[0] == used[1] + 1:
+            # Slots are dense: hand out the ones past the end
+            slots = list(range(used[1] + 1, min(self.capacity, used[1] + 1 + count)))
+        else:
+            taken = {row[0] for row in self._db.execute("SELECT slot FROM entries")}
+            slots = [s for s in range(self.capacity) if s not in taken][:count]
+
+        shortfall = count - len(slots)
+        if shortfall > 0:
+            # Slots another process is still writing are skipped unless abandoned
+            victims = self._db.execute(
+                "SELECT key, slot FROM entries WHERE key NOT LIKE ? OR last_used < ? ORDER BY last_used LIMIT ?",
+                (PENDING_PREFIX + "%", time.time() - PENDING_TIMEOUT, shortfall)
+            ).fetchall()
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in victims])
+            slots += [slot for _, slot in victims]
+        return slots
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+_store: Optional[EmbeddingStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> EmbeddingStore:
+    """Shared store for the configured sentence model and backend."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EmbeddingStore(EMBEDDING_MODEL_ID)
+        return _store
+
+
+def encode_cached(texts: List[str], batch_size: int = 32, use_cache: bool = EMBEDDING_CACHE_ENABLED) -> np.ndarray:
+    """
+    L2-normalized float32 embeddings for `texts`. Stored vectors are reused;
+    only texts never seen before go through the transformer.
+    """
+    def encode(batch: List[str]) -> np.ndarray:
+        return get_sentence_model().encode(
+            batch, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+        ).astype(np.float32)
+
+    if not texts:
+        return np.empty((0, 0), np.float32)
+    if not use_cache:
+        return encode(texts)
+
+    keys = [text_key(text) for text in texts]
+    try:
+        store = get_store()
+        found = store.get_many(list(set(keys)))
+    except Exception as e:
+        logger.warning(f"⚠️ Embedding store unavailable: {e}")
+        return encode(texts)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+    if missing:
+        encoded = encode(list(missing.values()))
+        fresh = dict(zip(missing.keys(), encoded))
+        try:
+            store.put_many(fresh)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write to embedding store: {e}")
+        found.update(fresh)
+
+    return np.stack([found[key] for key in keys])
@@ -1,136 +1,297 @@
 import os
-import requests
+import re
+import json
+import fcntl
+import threading
 from typing import List, Dict
-from dotenv import load_dotenv
 
-load_dotenv()
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+from utils.config import (
+    GRAPH_METADATA_CACHE_PATH, GRAPH_METADATA_BATCH_SIZE, GRAPH_METADATA_BATCH_RETRIES, SKILL_GRAPH_OFFLINE,
+    SKILL_DAG_OUTPUT, logger
+)
+from utils.llm_client import chat
+from utils.single_flight import single_flight
+from utils.skill_dependencies import get_skill_dag, local_prerequisites
 
-# Caches
+# Caches (keyed by lowercase skill, backed by GRAPH_METADATA_CACHE_PATH)
 prerequisite_cache: Dict[str, List[str]] = {}
 description_cache: Dict[str, str] = {}
+_cache_lock = threading.Lock()
+_cache_loaded = False
 
-# ------------------ Prerequisite Fetching ------------------ #
+# ------------------ Persistent Cache ------------------ #
 
-def fetch_prerequisites_openrouter(skill: str) -> List[str]:
-    prompt = f"What are 2–3 prerequisite skills or technologies required to learn {skill}? Return only a comma-separated list."
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "HTTP-Referer": "https://chat.openai.com",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "model": "openai/gpt-3.5-turbo",
-        "messages": [
-            {"role": "system", "content": "You are a helpful AI that lists prerequisite technologies."},
-            {"role": "user", "content": prompt}
-        ]
-    }
-    response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload)
-    response.raise_for_status()
-    text = response.json()["choices"][0]["message"]["content"]
-    return [s.strip() for s in text.split(",") if s.strip()]
+def _read_cache_file() -> Dict:
+    try:
+        with open(GRAPH_METADATA_CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"⚠️ Unreadable graph metadata cache: {e}")
+        return {}
+
+def load_persisted_metadata() -> Dict:
+    """{"descriptions": {...}, "prerequisites": {...}} as currently stored on disk."""
+    data = _read_cache_file()
+    return {"descriptions": data.get("descriptions", {}), "prerequisites": data.get("prerequisites", {})}
+
+def _load_cache() -> None:
+    global _cache_loaded
+    with _cache_lock:
+        if _cache_loaded:
+            return
+        data = _read_cache_file()
+        prerequisite_cache.update(data.get("prerequisites", {}))
+        description_cache.update(data.get("descriptions", {}))
+        _cache_loaded = True
+
+def _persisted(section: str, key: str):
+    """Value another worker stored since this process loaded the cache file (also cached in memory)."""
+    value = _read_cache_file().get(section, {}).get(key)
+    if value is not None:
+        (prerequisite_cache if section == "prerequisites" else description_cache)[key] = value
+    return value
+
+def _persist(section: str, key: str, value) -> None:
+    _persist_many({section: {key: value}})
 
-def fetch_prerequisites_gemini(skill: str) -> List[str]:
+def _persist_many(entries: Dict[str, Dict]) -> None:
+    """Merges {section: {key: value}} into the cache file under an exclusive lock (safe across workers)."""
+    os.makedirs(os.path.dirname(GRAPH_METADATA_CACHE_PATH), exist_ok=True)
+    try:
+        with _cache_lock, open(f"{GRAPH_METADATA_CACHE_PATH}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            data = _read_cache_file()
+            for section, values in entries.items():
+                data.setdefault(section, {}).update(values)
+            tmp_path = f"{GRAPH_METADATA_CACHE_PATH}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, GRAPH_METADATA_CACHE_PATH)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not write graph metadata cache: {e}")
+
+# ------------------ Prerequisite Fetching ------------------ #
+
+def fetch_prerequisites(skill: str) -> List[str]:
     prompt = f"What are 2–3 prerequisite skills or technologies required to learn {skill}? Return only a comma-separated list."
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={GEMINI_API_KEY}"
-    payload = { "contents": [{ "parts": [{ "text": prompt }] }] }
-    headers = {"Content-Type": "application/json"}
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
-    text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
+    text = chat(prompt, system="You are a helpful AI that lists prerequisite technologies.", hedge=True)
     return [s.strip() for s in text.split(",") if s.strip()]
 
 def get_prerequisites(skill: str) -> List[str]:
-    if skill in prerequisite_cache:
-        return prerequisite_cache[skill]
+    """Curated skill_map.json prerequisites first; an LLM is only asked about uncovered skills."""
+    local = local_prerequisites(skill)
+    if local is not None:
+        return local
+
+    _load_cache()
+    key = skill.lower()
+    if key in prerequisite_cache:
+        return prerequisite_cache[key]
+    if SKILL_GRAPH_OFFLINE:
+        return []
+    # Concurrent misses for the same skill (threads or workers) share one request
+    return single_flight(f"prerequisites:{key}", lambda: _generate_prerequisites(skill),
+                         recheck=lambda: _persisted("prerequisites", key))
+
+def _generate_prerequisites(skill: str) -> List[str]:
+    key = skill.lower()
     try:
-        prereqs = fetch_prerequisites_openrouter(skill)
+        prereqs = fetch_prerequisites(skill)
     except Exception as e:
-        print(f"⚠️ OpenRouter failed for {skill}: {e}")
-        try:
-            prereqs = fetch_prerequisites_gemini(skill)
-        except Exception as ge:
-            print(f"❌ Gemini also failed for {skill}: {ge}")
-            prereqs = []
-    prerequisite_cache[skill] = prereqs
+        logger.warning(f"❌ Prerequisites failed for {skill}: {e}")
+        prerequisite_cache[key] = []  # Don't retry in this process, but don't persist the failure
+        return []
+    prerequisite_cache[key] = prereqs
+    _persist("prerequisites", key, prereqs)
     return prereqs
 
 # ------------------ Description Fetching ------------------ #
 
-def fetch_description_openrouter(skill: str) -> str:
+def fetch_description(skill: str) -> str:
     prompt = f"Give a short 1-2 sentence professional description of the skill: {skill}"
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "HTTP-Referer": "https://chat.openai.com",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "model": "openai/gpt-3.5-turbo",
-        "messages": [
-            {"role": "system", "content": "You describe technical skills briefly."},
-            {"role": "user", "content": prompt}
-        ]
-    }
-    response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload)
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"].strip()
-
-def fetch_description_gemini(skill: str) -> str:
-    prompt = f"Give a short 1-2 sentence professional description of the skill: {skill}"
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={GEMINI_API_KEY}"
-    payload = { "contents": [{ "parts": [{ "text": prompt }] }] }
-    headers = {"Content-Type": "application/json"}
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
-    return response.json()["candidates"][0]["content"]["parts"][0]["text"].strip()
+    return chat(prompt, system="You describe technical skills briefly.", hedge=True)
 
 def get_description(skill: str) -> str:
-    if skill in description_cache:
-        return description_cache[skill]
+    _load_cache()
+    key = skill.lower()
+    if key in description_cache:
+        return description_cache[key]
+    if SKILL_GRAPH_OFFLINE:
+        return "No description available."
+    return single_flight(f"descriptions:{key}", lambda: _generate_description(skill),
+                         recheck=lambda: _persisted("descriptions", key))
+
+def _generate_description(skill: str) -> str:
+    key = skill.lower()
     try:
-        desc = fetch_description_openrouter(skill)
+        desc = fetch_description(skill)
     except Exception as e:
-        print(f"⚠️ OpenRouter description failed for {skill}: {e}")
-        try:
-            desc = fetch_description_gemini(skill)
-        except Exception as ge:
-            print(f"❌ Gemini description also failed for {skill}: {ge}")
-            desc = "No description available."
-    description_cache[skill] = desc
+        logger.warning(f"❌ Description failed for {skill}: {e}")
+        description_cache[key] = "No description available."
+        return description_cache[key]
+    description_cache[key] = desc
+    _persist("descriptions", key, desc)
     return desc
 
+# ------------------ Batched Metadata ------------------ #
+
+def batch_metadata_prompt(skills: List[str]) -> str:
+    return (
+        "For each skill below, give a short 1-2 sentence professional description and 2–3 prerequisite "
+        "skills or technologies required to learn it. Return only a JSON object that maps each skill, "
+        'spelled exactly as given, to {"description": "...", "prerequisites": ["...", "..."]}.\n\n'
+        "Skills:\n" + "\n".join(f"- {skill}" for skill in skills)
+    )
+
+def fetch_metadata_batch(skills: List[str]) -> str:
+    # An answer without a single usable entry counts as a provider failure (fails over)
+    return chat(
+        batch_metadata_prompt(skills),
+        system="You describe technical skills and their prerequisites. You answer with JSON only.",
+        json_mode=True,
+        validate=lambda text: bool(parse_metadata_batch(text, skills)),
+        hedge=True
+    )
+
+def parse_metadata_batch(text: str, skills: List[str]) -> Dict[str, Dict]:
+    """Valid {"description", "prerequisites"} entries by requested skill; malformed or missing skills are left out."""
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        match = re.search(r"\{.*\}", text, re.DOTALL)
+        try:
+            data = json.loads(match.group(0)) if match else {}
+        except json.JSONDecodeError:
+            data = {}
+    if not isinstance(data, dict):
+        return {}
+
+    by_lower = {str(key).strip().lower(): value for key, value in data.items()}
+    parsed = {}
+    for skill in skills:
+        entry = by_lower.get(skill.lower())
+        if not isinstance(entry, dict):
+            continue
+        desc = entry.get("description")
+        prereqs = entry.get("prerequisites")
+        if isinstance(prereqs, str):
+            prereqs = prereqs.split(",")
+        if not isinstance(desc, str) or not desc.strip() or not isinstance(prereqs, list):
+            continue
+        parsed[skill] = {
+            "description": desc.strip(),
+            "prerequisites": [p.strip() for p in prereqs if isinstance(p, str) and p.strip()]
+        }
+    return parsed
+
+def _fetch_metadata_batch(skills: List[str]) -> Dict[str, Dict]:
+    try:
+        results = parse_metadata_batch(fetch_metadata_batch(skills), skills)
+    except Exception as e:
+        logger.warning(f"❌ Batch metadata failed for {len(skills)} skills: {e}")
+        return {}
+
+    entries = {"descriptions": {}, "prerequisites": {}}
+    for skill, meta in results.items():
+        entries["descriptions"][skill.lower()] = meta["description"]
+        if local_prerequisites(skill) is None:
+            entries["prerequisites"][skill.lower()] = meta["prerequisites"]
+    if results:
+        _persist_many(entries)
+    return results
+
+def _persisted_batch(skills: List[str]) -> Dict[str, Dict]:
+    """Entries another worker stored for `skills` since this process loaded the cache file (None if none)."""
+    data = load_persisted_metadata()
+    found = {}
+    for skill in skills:
+        key = skill.lower()
+        local = local_prerequisites(skill)
+        prereqs = local if local is not None else data["prerequisites"].get(key)
+        if key in data["descriptions"] and prereqs is not None:
+            found[skill] = {"description": data["descriptions"][key], "prerequisites": prereqs}
+    return found or None
+
+def prefetch_metadata(skills: List[str], batch_size: int = GRAPH_METADATA_BATCH_SIZE,
+                      retries: int = GRAPH_METADATA_BATCH_RETRIES) -> None:
+    """
+    Fills the description / prerequisite caches for `skills` with batched
+    JSON prompts (batch_size skills per request). Only skills whose entry
+    was missing or malformed are retried; whatever still fails is left to
+    the per-skill get_description / get_prerequisites fallbacks.
+    """
+    _load_cache()
+    if SKILL_GRAPH_OFFLINE or batch_size <= 0:
+        return
+    pending = [
+        skill for skill in dict.fromkeys(skills)
+        if skill.lower() not in description_cache
+        or (local_prerequisites(skill) is None and skill.lower() not in prerequisite_cache)
+    ]
+
+    for attempt in range(retries + 1):
+        if not pending:
+            return
+        failed = []
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            logger.info(f"🔍 Fetching metadata for {len(batch)} skills in one request")
+            # The same batch requested concurrently (threads or workers) is fetched once
+            batch_key = "metadata:" + "|".join(sorted(skill.lower() for skill in batch))
+            results = single_flight(batch_key, lambda batch=batch: _fetch_metadata_batch(batch),
+                                    recheck=lambda batch=batch: _persisted_batch(batch)) or {}
+
+            for skill, meta in results.items():
+                description_cache[skill.lower()] = meta["description"]
+                if local_prerequisites(skill) is None:
+                    prerequisite_cache[skill.lower()] = meta["prerequisites"]
+            failed += [skill for skill in batch if skill not in results]
+        pending = failed
+
+    if pending:
+        logger.warning(f"⚠️ Batched metadata failed for {len(pending)} skills; falling back to per-skill requests.")
+
 # ------------------ Graph Builder ------------------ #
 
-def build_graph_nodes_and_edges(matched: List[str], missing: List[str]) -> Dict:
+def build_graph_nodes_and_edges(matched: List[str], missing: List[str], dag_levels: bool = SKILL_DAG_OUTPUT) -> Dict:
     """
     Builds skill roadmap graph from both matched + missing skills.
     - Nodes: all matched and missing skills.
-    - Edges: dynamic API-based prerequisites.
+    - Edges: skill_map.json dependencies, LLM prerequisites for uncovered skills.
     - Colors: green for matched, red for missing.
     - Tooltip: short description of each skill.
+    - Level (with dag_levels / SKILL_DAG_OUTPUT): topological rank in the skill_map.json dependency DAG
+      (0 for foundations / unknown skills).
     """
     all_skills = sorted(set(matched + missing))
+    by_lower = {s.lower(): s for s in all_skills}
+    dag = get_skill_dag() if dag_levels else None
+    prefetch_metadata(all_skills)
     nodes = []
     edges = []
 
     for skill in all_skills:
-        print(f"🔍 Fetching metadata for: {skill}")
+        logger.debug(f"🔍 Adding graph node for: {skill}")
         desc = get_description(skill)
         color = "#22c55e" if skill in matched else "#ef4444"
-        nodes.append({
+        node = {
             "id": skill,
             "label": skill,
             "description": desc,
             "color": color
-        })
+        }
+        if dag is not None:
+            node["level"] = dag.rank(skill) or 0
+        nodes.append(node)
 
     for skill in all_skills:
         prereqs = get_prerequisites(skill)
         for prereq in prereqs:
-            match = next((s for s in all_skills if s.lower() == prereq.lower()), None)
-            if match:
+            match = by_lower.get(prereq.lower())
+            if match and match != skill:
                 edges.append({
                     "from": match,
                     "to": skill
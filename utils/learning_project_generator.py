@@ -1,52 +1,39 @@
-import os
 import sys
 import json
-import requests
-import random
-from time import sleep
-from dotenv import load_dotenv
+from typing import Dict, List
+
+from utils.content_store import get_content_store, skill_key
+from utils.llm_client import chat
+from utils.single_flight import single_flight
 
 # ✅ Ensure UTF-8 output (for Windows terminals)
 if hasattr(sys.stdout, 'reconfigure'):
     sys.stdout.reconfigure(encoding='utf-8')
 
-# ✅ Load API keys from .env
-load_dotenv()
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-# ✅ Cache directory setup
-CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", ".cache")
-os.makedirs(CACHE_DIR, exist_ok=True)
-
-# ✅ API rotation logic
-api_sequence = ["openrouter", "gemini"]
-rotation_counter = {api: 0 for api in api_sequence}
-ROTATE_AFTER = random.randint(10, 15)  # change after every 10–15 requests
-
 # -------------------------
 # 📁 Cache Helpers
 # -------------------------
-def get_skill_folder(skill: str) -> str:
-    return os.path.join(CACHE_DIR, skill.replace(" ", "_").lower())
+CACHE_MODE = "learning_and_projects"
+
+def is_valid_result(cache) -> bool:
+    return (
+        isinstance(cache, dict) and "learning_path" in cache and "project_ideas" in cache
+        and bool(cache["learning_path"] or cache["project_ideas"])
+    )
 
 def load_from_cache(skill: str, mode: str):
-    folder = get_skill_folder(skill)
-    file_path = os.path.join(folder, f"{mode}.json")
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"⚠️ Corrupted cache for {skill}: {e}")
-    return None
+    return get_content_store().get(mode, skill_key(skill))
+
+def load_many_from_cache(skills: List[str], mode: str = CACHE_MODE) -> Dict[str, dict]:
+    """Valid cached results for a list of skills, read in one query."""
+    found = get_content_store().get_many(mode, [skill_key(skill) for skill in skills])
+    return {
+        skill: found[skill_key(skill)] for skill in skills
+        if is_valid_result(found.get(skill_key(skill)))
+    }
 
 def save_to_cache(skill: str, mode: str, data):
-    folder = get_skill_folder(skill)
-    os.makedirs(folder, exist_ok=True)
-    file_path = os.path.join(folder, f"{mode}.json")
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    get_content_store().put(mode, skill_key(skill), data)
 
 # -------------------------
 # ✍️ Prompt Template
@@ -69,66 +56,17 @@ Project Ideas:
 - Idea 3...
 """
 
-# -------------------------
-# 🔌 API Calls
-# -------------------------
-def call_openrouter(prompt: str):
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "HTTP-Referer": "https://chat.openai.com",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "model": "openai/gpt-3.5-turbo",
-        "messages": [
-            {"role": "system", "content": "You are an expert career guide AI."},
-            {"role": "user", "content": prompt}
-        ]
-    }
-    response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload)
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"]
-
-def call_gemini(prompt: str):
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={GEMINI_API_KEY}"
-    payload = {
-        "contents": [{"parts": [{"text": prompt}]}]
-    }
-    response = requests.post(url, json=payload)
-    response.raise_for_status()
-    return response.json()["candidates"][0]["content"]["parts"][0]["text"]
-
 # -------------------------
 # 🧠 Smart API Router
 # -------------------------
 def smart_generate(prompt: str):
-    global api_sequence, rotation_counter
-
-    for i in range(len(api_sequence)):
-        api = api_sequence[i]
-        try:
-            print(f"⚙️ Trying {api} GPT...")
-            if api == "openrouter":
-                result = call_openrouter(prompt)
-            elif api == "gemini":
-                result = call_gemini(prompt)
-            else:
-                raise ValueError("Unknown API in sequence")
-
-            # ✅ Successful
-            rotation_counter[api] += 1
-            if rotation_counter[api] >= ROTATE_AFTER:
-                api_sequence.append(api_sequence.pop(0))
-                rotation_counter[api] = 0
-
-            return result
-
-        except Exception as e:
-            print(f"[{api.upper()}] ❌ Error: {e}")
-            sleep(1)
-            continue
-
-    return None
+    """Provider choice, failover, timeouts and backoff are handled by the shared LLM client."""
+    try:
+        return chat(prompt, system="You are an expert career guide AI.",
+                    validate=lambda text: len(text.strip()) >= 30)
+    except Exception as e:
+        print(f"❌ Generation failed: {e}")
+        return None
 
 # -------------------------
 # 🧹 Parse Result
@@ -158,20 +96,24 @@ def parse_learning_and_projects(text: str):
 # -------------------------
 # 🚀 Main Skill Handler
 # -------------------------
+def cached_result(skill: str):
+    cache = load_from_cache(skill, CACHE_MODE)
+    return cache if is_valid_result(cache) else None
+
 def generate_learning_and_projects(skill: str):
-    folder = get_skill_folder(skill)
-    cache = load_from_cache(skill, "learning_and_projects")
+    cache = load_from_cache(skill, CACHE_MODE)
 
     if cache:
-        if isinstance(cache, dict) and "learning_path" in cache and "project_ideas" in cache:
-            if cache["learning_path"] or cache["project_ideas"]:
-                print(f"⚠️ Skipping {skill} — already generated.")
-                return cache
-            else:
-                print(f"⚠️ Invalid or empty result for {skill}")
-        else:
-            print(f"⚠️ Corrupted or old cache format for {skill}")
+        if is_valid_result(cache):
+            print(f"⚠️ Skipping {skill} — already generated.")
+            return cache
+        print(f"⚠️ Invalid or old cache format for {skill}")
+
+    # Concurrent misses for the same skill (threads or workers) share one generation
+    return single_flight(f"{CACHE_MODE}:{skill_key(skill)}", lambda: _generate(skill),
+                         recheck=lambda: cached_result(skill))
 
+def _generate(skill: str):
     prompt = build_prompt(skill)
     text_result = smart_generate(prompt)
 
@@ -190,7 +132,7 @@ def generate_learning_and_projects(skill: str):
         "project_ideas": projects
     }
 
-    save_to_cache(skill, "learning_and_projects", result)
+    save_to_cache(skill, CACHE_MODE, result)
     return result
 
 # -------------------------
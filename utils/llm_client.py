@@ -0,0 +1,436 @@
+"""
+Shared LLM client for OpenRouter and Gemini.
+
+Every module that needs a chat completion calls chat(). The client
+- reuses keep-alive connections from one pooled requests.Session per process,
+- applies connect / read timeouts to every call,
+- spaces calls to each provider under its LLM_RATE_LIMITS requests/minute,
+- orders providers by median recent latency and a decaying error rate,
+  sending a small share of calls to the runner-up to keep its stats fresh,
+- opens a circuit breaker after LLM_BREAKER_FAILURES consecutive failures
+  and sends a single trial call once LLM_BREAKER_COOLDOWN seconds pass,
+- fails over to the next provider at once, and waits with exponential
+  backoff plus full jitter only before going round the providers again.
+
+A provider that hangs therefore costs one read timeout. Its breaker then
+routes later calls elsewhere.
+
+Optional hedging (LLM_HEDGE_ENABLED, for callers that pass hedge=True):
+suppose the primary provider has not answered within the
+LLM_HEDGE_PERCENTILE of its recent latencies. The same prompt then goes to
+the next provider, and the first valid answer wins. A losing request cannot
+be interrupted mid-read, so its result is discarded (or it is cancelled if
+it has not started yet). Hedges are capped at LLM_HEDGE_MAX_RATE of calls.
+hedge_stats() reports the hedge rate and the latency saved.
+
+    python -m utils.llm_client "Describe Kubernetes in one sentence" [--hedge]
+"""
+import os
+import json
+import time
+import random
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.config import (
+    LLM_PROVIDERS, LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT, LLM_MAX_ATTEMPTS, LLM_POOL_SIZE,
+    LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX,
+    LLM_HEDGE_ENABLED, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_DELAY, LLM_HEDGE_COLD_DELAY, LLM_HEDGE_MAX_RATE,
+    LLM_RATE_LIMITS, logger
+)
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_MODEL = "openai/gpt-3.5-turbo"
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
+EWMA_ALPHA = 0.2
+EXPLORE_RATE = 0.05  # Share of calls that try the runner-up provider first
+ERROR_HALF_LIFE = 60.0  # seconds; an idle provider's error rate fades so it gets tried again
+HEDGE_MIN_SAMPLES = 20  # Latencies needed before the percentile deadline is trusted
+
+
+class LLMError(RuntimeError):
+    """Raised when no provider produced a valid answer."""
+
+
+# ---------- Providers ----------
+def _openrouter_request(system: Optional[str], prompt: str, json_mode: bool) -> Tuple[str, Dict, Dict]:
+    headers = {
+        "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
+        "HTTP-Referer": "https://chat.openai.com",
+        "Content-Type": "application/json"
+    }
+    messages = [{"role": "system", "content": system}] if system else []
+    payload = {"model": OPENROUTER_MODEL, "messages": messages + [{"role": "user", "content": prompt}]}
+    if json_mode:
+        payload["response_format"] = {"type": "json_object"}
+    return OPENROUTER_URL, headers, payload
+
+
+def _openrouter_text(data: Dict) -> str:
+    return data["choices"][0]["message"]["content"]
+
+
+def _gemini_request(system: Optional[str], prompt: str, json_mode: bool) -> Tuple[str, Dict, Dict]:
+    text = f"{system}\n\n{prompt}" if system else prompt
+    payload = {"contents": [{"parts": [{"text": text}]}]}
+    if json_mode:
+        payload["generationConfig"] = {"responseMimeType": "application/json"}
+    return f"{GEMINI_URL}?key={os.getenv('GEMINI_API_KEY')}", {"Content-Type": "application/json"}, payload
+
+
+def _gemini_text(data: Dict) -> str:
+    return data["candidates"][0]["content"]["parts"][0]["text"]
+
+
+PROVIDERS = {
+    "openrouter": (_openrouter_request, _openrouter_text, "OPENROUTER_API_KEY"),
+    "gemini": (_gemini_request, _gemini_text, "GEMINI_API_KEY"),
+}
+
+
+# ---------- Health tracking ----------
+@dataclass
+class ProviderHealth:
+    error_rate: float = 0.0           # EWMA of failures (0..1) as of updated_at
+    updated_at: float = 0.0
+    consecutive_failures: int = 0
+    opened_at: Optional[float] = None  # Breaker open since (None = closed)
+    trial_in_flight: bool = False
+    calls: int = 0
+    failures: int = 0
+    samples: deque = field(default_factory=lambda: deque(maxlen=200), repr=False)  # Recent successful latencies
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def available(self, now: float) -> bool:
+        """Closed breakers always pass; an open one lets a single trial call through after the cooldown."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if now - self.opened_at >= LLM_BREAKER_COOLDOWN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def release_trial(self) -> None:
+        """Gives back a half-open trial claimed by available() for a call that never ran."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record(self, ok: bool, elapsed: float) -> None:
+        with self.lock:
+            self.calls += 1
+            self.trial_in_flight = False
+            self.error_rate = (1 - EWMA_ALPHA) * self.current_error_rate() + EWMA_ALPHA * (0.0 if ok else 1.0)
+            self.updated_at = time.monotonic()
+            if ok:
+                self.samples.append(elapsed)
+                self.consecutive_failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= LLM_BREAKER_FAILURES:
+                    self.opened_at = time.monotonic()
+
+    def current_error_rate(self) -> float:
+        return self.error_rate * 0.5 ** ((time.monotonic() - self.updated_at) / ERROR_HALF_LIFE)
+
+    def score(self) -> float:
+        """Expected seconds per call: median latency plus a read timeout per expected failure."""
+        return (self.percentile(50, min_samples=1) or 0.0) + self.current_error_rate() * LLM_READ_TIMEOUT
+
+    def percentile(self, pct: float, min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0          # Hedge-eligible calls
+    hedged: int = 0         # Calls that fired a second request
+    hedge_wins: int = 0     # ... where the second request answered first
+    latency_saved: float = 0.0  # Seconds, primary finish time minus winner time, summed over wins
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class RateLimiter:
+    """Spaces calls at least 60 / per_minute seconds apart (shared by all threads of a process)."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            delay = max(0.0, self.next_at - now)
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay:
+            time.sleep(delay)
+
+
+_health: Dict[str, ProviderHealth] = {name: ProviderHealth() for name in PROVIDERS}
+_rate_limits: Dict[str, RateLimiter] = {
+    name: RateLimiter(per_minute) for name, per_minute in LLM_RATE_LIMITS.items() if per_minute > 0
+}
+_hedge = HedgeStats()
+_sessions: Dict[int, requests.Session] = {}
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Pooled keep-alive session, one per process (prefork workers must not share sockets)."""
+    pid = os.getpid()
+    with _session_lock:
+        session = _sessions.get(pid)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=len(PROVIDERS), pool_maxsize=LLM_POOL_SIZE)
+            session.mount("https://", adapter)
+            _sessions.clear()
+            _sessions[pid] = session
+        return session
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Threads for hedged calls, one pool per process."""
+    pid = os.getpid()
+    with _session_lock:
+        executor = _executors.get(pid)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=LLM_POOL_SIZE, thread_name_prefix="llm-hedge")
+            _executors.clear()
+            _executors[pid] = executor
+        return executor
+
+
+def ranked_providers(providers: Optional[List[str]] = None) -> List[str]:
+    """Configured providers with an API key, healthiest first (config order breaks ties)."""
+    names = [p for p in (providers or LLM_PROVIDERS) if p in PROVIDERS and os.getenv(PROVIDERS[p][2])]
+    ranked = sorted(names, key=lambda p: _health[p].score())
+    if len(ranked) > 1 and random.random() < EXPLORE_RATE:
+        ranked[0], ranked[1] = ranked[1], ranked[0]
+    return ranked
+
+
+def provider_stats() -> Dict[str, Dict]:
+    return {
+        name: {
+            "calls": h.calls, "failures": h.failures, "error_rate": round(h.current_error_rate(), 3),
+            "p50_ms": round(h.percentile(50, 1) * 1000, 1) if h.samples else None,
+            "p95_ms": round(h.percentile(95, 1) * 1000, 1) if h.samples else None,
+            "breaker": "open" if h.opened_at is not None else "closed"
+        }
+        for name, h in _health.items()
+    }
+
+
+def set_rate_limit(provider: str, per_minute: Optional[float]) -> None:
+    """Caps calls to `provider` at per_minute (None or 0 removes the cap)."""
+    if per_minute:
+        _rate_limits[provider] = RateLimiter(per_minute)
+    else:
+        _rate_limits.pop(provider, None)
+
+
+def hedge_stats() -> Dict:
+    with _hedge.lock:
+        return {
+            "calls": _hedge.calls, "hedged": _hedge.hedged,
+            "hedge_rate": round(_hedge.hedged / _hedge.calls, 3) if _hedge.calls else 0.0,
+            "hedge_wins": _hedge.hedge_wins,
+            "latency_saved_s": round(_hedge.latency_saved, 3),
+            "mean_saved_ms": round(_hedge.latency_saved / _hedge.hedge_wins * 1000, 1) if _hedge.hedge_wins else 0.0
+        }
+
+
+def hedge_delay(provider: str) -> float:
+    """Seconds to wait for `provider` before hedging: its latency percentile, or a fixed delay until it has history."""
+    observed = _health[provider].percentile(LLM_HEDGE_PERCENTILE)
+    return LLM_HEDGE_COLD_DELAY if observed is None else max(LLM_HEDGE_MIN_DELAY, observed)
+
+
+def backoff_delay(round_index: int) -> float:
+    """Full-jitter exponential backoff before retry round `round_index` (1-based)."""
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** (round_index - 1))))
+
+
+# ---------- Calls ----------
+def call_provider(provider: str, prompt: str, system: Optional[str] = None, json_mode: bool = False,
+                  timeout: Optional[Tuple[float, float]] = None,
+                  validate: Optional[Callable[[str], bool]] = None) -> str:
+    """One call to one provider, recorded in its health stats. Raises on error or invalid output."""
+    build, extract, _ = PROVIDERS[provider]
+    try:
+        url, headers, payload = build(system, prompt, json_mode)
+    except Exception:
+        _health[provider].release_trial()
+        raise
+    if provider in _rate_limits:
+        _rate_limits[provider].acquire()
+    start = time.monotonic()
+    try:
+        response = get_session().post(url, headers=headers, json=payload,
+                                      timeout=timeout or (LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT))
+        response.raise_for_status()
+        text = extract(response.json()).strip()
+        if not text or (validate and not validate(text)):
+            raise ValueError("empty or invalid response")
+    except Exception:
+        _health[provider].record(False, time.monotonic() - start)
+        raise
+    _health[provider].record(True, time.monotonic() - start)
+    return text
+
+
+def _unhedge(provider: str) -> None:
+    """A hedge that never ran: it is not counted and frees its provider's breaker trial, if it held one."""
+    _health[provider].release_trial()
+    with _hedge.lock:
+        _hedge.hedged -= 1
+
+
+def hedged_call(prompt: str, system: Optional[str] = None, json_mode: bool = False,
+                validate: Optional[Callable[[str], bool]] = None, timeout: Optional[Tuple[float, float]] = None,
+                providers: Optional[List[str]] = None) -> Tuple[Optional[str], int]:
+    """
+    Primary call plus, past the hedge deadline, one call to the next
+    provider. Returns (first valid answer or None, requests made).
+    """
+    ranked = ranked_providers(providers)
+    primary = next((p for p in ranked if _health[p].available(time.monotonic())), None)
+    if primary is None:
+        return None, 0
+
+    executor = _get_executor()
+    started = threading.Event()
+    hedge_state = {"finished": False, "sent": False}
+    hedge_lock = threading.Lock()
+
+    def run_primary() -> str:
+        started.set()
+        return call_provider(primary, prompt, system, json_mode, timeout, validate)
+
+    def primary_done(future: Future) -> None:
+        # Runs in the pool thread before it dequeues anything else, so a queued hedge sees the answer
+        if not future.cancelled() and future.exception() is None:
+            with hedge_lock:
+                hedge_state["finished"] = True
+
+    primary_future = executor.submit(run_primary)
+    primary_future.add_done_callback(primary_done)
+    futures: Dict[Future, str] = {primary_future: primary}
+    with _hedge.lock:
+        _hedge.calls += 1
+        may_hedge = _hedge.hedged < LLM_HEDGE_MAX_RATE * _hedge.calls
+
+    # The hedge deadline runs from when the primary starts, not from when it was queued
+    started.wait()
+    start = time.monotonic()
+    done, _ = wait([primary_future], timeout=hedge_delay(primary))
+    if not done and may_hedge:
+        secondary = next((p for p in ranked if p != primary and _health[p].available(time.monotonic())), None)
+        if secondary:
+            logger.info(f"⏱️ {primary} is slow; hedging with {secondary}")
+            with _hedge.lock:
+                _hedge.hedged += 1
+
+            def run_secondary() -> str:
+                with hedge_lock:
+                    hedge_state["sent"] = not hedge_state["finished"]
+                if not hedge_state["sent"]:
+                    # Dequeued after the call was already answered: never sent
+                    _unhedge(secondary)
+                    raise CancelledError()
+                return call_provider(secondary, prompt, system, json_mode, timeout, validate)
+
+            futures[executor.submit(run_secondary)] = secondary
+
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if isinstance(future.exception(), CancelledError):
+                continue
+            if future.exception() is not None:
+                logger.warning(f"⚠️ {futures[future]} call failed: {future.exception()}")
+                continue
+            if future is not primary_future:
+                won_after = time.monotonic() - start
+                with _hedge.lock:
+                    _hedge.hedge_wins += 1
+
+                def record_saving(_, won_after=won_after):
+                    with _hedge.lock:
+                        _hedge.latency_saved += max(0.0, time.monotonic() - start - won_after)
+                primary_future.add_done_callback(record_saving)
+            with hedge_lock:
+                hedge_state["finished"] = True
+                sent_count = 1 + hedge_state["sent"]
+            for loser in pending:
+                if loser.cancel():
+                    _unhedge(futures[loser])
+            return future.result(), sent_count
+    return None, len(futures)
+
+
+def chat(prompt: str, system: Optional[str] = None, json_mode: bool = False,
+         validate: Optional[Callable[[str], bool]] = None, max_attempts: int = LLM_MAX_ATTEMPTS,
+         timeout: Optional[Tuple[float, float]] = None, providers: Optional[List[str]] = None,
+         hedge: bool = False) -> str:
+    """
+    Completion text from the healthiest available provider, failing over on
+    errors, timeouts and answers rejected by `validate`. Raises LLMError
+    once max_attempts calls have failed or every breaker is open. With
+    hedge=True (and LLM_HEDGE_ENABLED) the first attempt is a hedged call.
+    """
+    errors = []
+    attempts = 0
+    round_index = 0
+    if hedge and LLM_HEDGE_ENABLED:
+        text, attempts = hedged_call(prompt, system, json_mode, validate, timeout, providers)
+        if text is not None:
+            return text
+        errors.append("hedged call failed")
+    while attempts < max_attempts:
+        if round_index:
+            time.sleep(backoff_delay(round_index))
+        tried = False
+        for provider in ranked_providers(providers):
+            if attempts >= max_attempts or not _health[provider].available(time.monotonic()):
+                continue
+            tried = True
+            attempts += 1
+            try:
+                return call_provider(provider, prompt, system, json_mode, timeout, validate)
+            except Exception as e:
+                logger.warning(f"⚠️ {provider} call failed: {e}")
+                errors.append(f"{provider}: {e}")
+        if not tried:
+            break
+        round_index += 1
+
+    raise LLMError("; ".join(errors) or "no LLM provider available (missing API keys or open breakers)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared LLM client")
+    parser.add_argument("prompt")
+    parser.add_argument("--system", default=None)
+    parser.add_argument("--hedge", action="store_true", help="Hedge the call (needs LLM_HEDGE_ENABLED=1)")
+    args = parser.parse_args()
+
+    print(chat(args.prompt, system=args.system, hedge=args.hedge))
+    print(json.dumps({"providers": provider_stats(), "hedging": hedge_stats()}, indent=2))
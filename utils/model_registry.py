@@ -0,0 +1,143 @@
+"""
+Shared lazy model registry.
+
+Every NLP model is loaded on first use and the same instance is handed to all
+callers, so a process holds at most one copy of MiniLM and of each spaCy
+pipeline. Run `python -m utils.model_registry` for a load time / memory report.
+"""
+import os
+import sys
+import json
+import time
+import threading
+from typing import Callable, Dict, Optional
+
+from utils.config import (
+    CUSTOM_MODEL_PATH, SPACY_MD_MODEL, EMBEDDING_BACKEND, EMBEDDING_MODEL_ID, NER_ONLY_PIPELINES, logger
+)
+
+_models: Dict[str, object] = {}
+_load_stats: Dict[str, Dict] = {}
+_lock = threading.RLock()
+
+
+# ---------- Memory helpers ----------
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (0.0 if it can't be read)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss is bytes on macOS, KB elsewhere
+            return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+        except ImportError:
+            return 0.0
+
+
+def _get_or_load(name: str, loader: Callable[[], object]) -> object:
+    if name in _models:
+        return _models[name]
+
+    with _lock:
+        if name in _models:
+            return _models[name]
+
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        model = loader()
+        elapsed = time.perf_counter() - start
+        rss_after = current_rss_mb()
+
+        _models[name] = model
+        _load_stats[name] = {
+            "load_seconds": round(elapsed, 3),
+            "rss_delta_mb": round(rss_after - rss_before, 1),
+            "loaded": model is not None
+        }
+        logger.info(f"✅ Loaded {name} in {elapsed:.2f}s (+{rss_after - rss_before:.0f} MB RSS)")
+        return model
+
+
+# ---------- Loaders ----------
+def keep_ner_only(nlp):
+    """
+    Removes every pipeline component NER doesn't depend on (tagger, parser,
+    attribute_ruler, lemmatizer, ...). A shared tok2vec is kept only if the
+    NER component listens to it. Only doc.ents is read downstream.
+    """
+    if "ner" not in nlp.pipe_names:
+        return nlp
+
+    needed = {"ner", "entity_ruler"} & set(nlp.pipe_names)
+    for name, component in nlp.pipeline:
+        if needed & set(getattr(component, "listening_components", [])):
+            needed.add(name)
+
+    removed = [name for name in nlp.pipe_names if name not in needed]
+    for name in removed:
+        nlp.remove_pipe(name)
+    if removed:
+        logger.info(f"✂️ Removed unused spaCy components: {', '.join(removed)}")
+    return nlp
+
+
+def _load_sentence_model():
+    from utils.embedding_backends import load_backend
+    return load_backend(EMBEDDING_BACKEND)
+
+
+def _load_spacy_md():
+    import spacy
+    nlp = spacy.load(SPACY_MD_MODEL)
+    return keep_ner_only(nlp) if NER_ONLY_PIPELINES else nlp
+
+
+def _load_spacy_custom():
+    import spacy
+    try:
+        nlp = spacy.load(CUSTOM_MODEL_PATH)
+        logger.info(f"✅ Loaded custom spaCy model from: {CUSTOM_MODEL_PATH}")
+        return keep_ner_only(nlp) if NER_ONLY_PIPELINES else nlp
+    except OSError:
+        logger.error(f"❌ Failed to load custom spaCy model at: {CUSTOM_MODEL_PATH}")
+        return None
+
+
+# ---------- Public accessors ----------
+def get_sentence_model():
+    """Shared all-MiniLM-L6-v2 encoder for the configured EMBEDDING_BACKEND."""
+    return _get_or_load(EMBEDDING_MODEL_ID, _load_sentence_model)
+
+
+def get_spacy_md():
+    """Shared en_core_web_md pipeline."""
+    return _get_or_load(SPACY_MD_MODEL, _load_spacy_md)
+
+
+def get_spacy_custom() -> Optional[object]:
+    """Shared custom NER pipeline from output/model-best, or None if it failed to load."""
+    return _get_or_load("custom_ner", _load_spacy_custom)
+
+
+def preload_all() -> None:
+    """Loads every model up front (used by long-running servers before forking)."""
+    get_spacy_md()
+    get_spacy_custom()
+    get_sentence_model()
+
+
+def load_report() -> Dict:
+    """Load time and resident-memory growth per model loaded so far."""
+    return {
+        "models": dict(_load_stats),
+        "total_rss_mb": round(current_rss_mb(), 1)
+    }
+
+
+if __name__ == "__main__":
+    preload_all()
+    print(json.dumps(load_report(), indent=2))
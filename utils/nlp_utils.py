@@ -1,20 +1,11 @@
 import re
-import spacy
-from typing import List, Dict
-from sentence_transformers import SentenceTransformer
-from utils.config import CUSTOM_MODEL_PATH, logger
-
-# ---------- Load NLP Models Once ----------
-nlp_md = spacy.load("en_core_web_md")  # Used for sentence parsing
-semantic_model = SentenceTransformer("all-MiniLM-L6-v2")  # Optional backup if needed
-
-# Load your custom trained spaCy NER model
-try:
-    nlp_custom = spacy.load(CUSTOM_MODEL_PATH)
-    logger.info(f"✅ Loaded custom spaCy model from: {CUSTOM_MODEL_PATH}")
-except OSError:
-    logger.error(f"❌ Failed to load custom spaCy model at: {CUSTOM_MODEL_PATH}")
-    nlp_custom = None
+from typing import Iterable, List, Dict, NamedTuple, Optional
+from utils.config import SKILL_EXTRACTION_MODE, NER_CHUNK_CHARS, NER_CHUNK_THRESHOLD, logger
+from utils.model_registry import get_spacy_md, get_spacy_custom
+from utils.skill_gazetteer import match_skills
+from utils.text_chunking import iter_chunks
+
+SKILL_EXTRACTION_MODES = ("ner", "gazetteer", "merged")
 
 # Optional alias normalization
 ALIAS_MAP = {
@@ -34,14 +25,141 @@ def normalize_skill(skill: str) -> str:
     return ALIAS_MAP.get(skill.strip().lower(), skill.strip().lower())
 
 
-def extract_named_entities(text: str) -> Dict[str, List[str]]:
+def extract_named_entities(text: str, mode: str = SKILL_EXTRACTION_MODE) -> Dict[str, List[str]]:
     """
     Extracts named entities for skills, education, certifications, and name using spaCy NER.
     Also includes regex-based fallback for skills listed under 'Skills:' or 'Programming:'.
+
+    mode: "ner" (spaCy only), "gazetteer" (skill_map phrase index only, skills
+    only, no models loaded) or "merged" (NER results plus gazetteer skills).
     """
+    check_mode(mode)
+    if mode == "gazetteer":
+        return gazetteer_entities(text)
+    if len(text) > NER_CHUNK_THRESHOLD:
+        return extract_named_entities_chunked(text, mode=mode)
+
+    nlp_md = get_spacy_md()
+    nlp_custom = get_spacy_custom()
     doc_md = nlp_md(text)
     doc_custom = nlp_custom(text) if nlp_custom else None
+    result = entities_from_docs(text, doc_md, doc_custom)
+    return merge_gazetteer_skills(text, result) if mode == "merged" else result
+
+
+def extract_named_entities_batch(texts: Iterable[str], batch_size: int = 32, n_process: int = 1,
+                                 mode: str = SKILL_EXTRACTION_MODE) -> List[Dict[str, List[str]]]:
+    """
+    Batched extract_named_entities: runs both pipelines with nlp.pipe over all texts.
+    Returns one result per text, identical to calling extract_named_entities on each.
+    """
+    check_mode(mode)
+    texts = list(texts)
+    if mode == "gazetteer":
+        return [gazetteer_entities(text) for text in texts]
+
+    # Very long documents go through the chunked path instead of one huge doc
+    results = [extract_named_entities_chunked(text, mode=mode) if len(text) > NER_CHUNK_THRESHOLD else None
+               for text in texts]
+    short_texts = [text for text, result in zip(texts, results) if result is None]
+
+    nlp_md = get_spacy_md()
+    nlp_custom = get_spacy_custom()
+
+    docs_md = nlp_md.pipe(short_texts, batch_size=batch_size, n_process=n_process)
+    if nlp_custom:
+        docs_custom = nlp_custom.pipe(short_texts, batch_size=batch_size, n_process=n_process)
+    else:
+        docs_custom = (None for _ in short_texts)
+
+    short_results = iter(
+        entities_from_docs(text, doc_md, doc_custom)
+        for text, doc_md, doc_custom in zip(short_texts, docs_md, docs_custom)
+    )
+    for i, text in enumerate(texts):
+        if results[i] is None:
+            result = next(short_results)
+            results[i] = merge_gazetteer_skills(text, result) if mode == "merged" else result
+    return results
+
+
+class ChunkEntity(NamedTuple):
+    """An entity from one chunk, with offsets into the full document."""
+    text: str
+    label_: str
+    start_char: int
+    end_char: int
+
+
+def iter_chunk_entities(nlp, text: str, max_chars: int, batch_size: int) -> Iterable[ChunkEntity]:
+    """Runs `nlp` over bounded chunks of `text`, keeping only the entities (not the docs)."""
+    chunks = iter_chunks(text, max_chars)
+    offsets = []
+
+    def chunk_texts():
+        for offset, chunk in chunks:
+            offsets.append(offset)
+            yield chunk
+
+    for i, doc in enumerate(nlp.pipe(chunk_texts(), batch_size=batch_size)):
+        offset = offsets[i]
+        for ent in doc.ents:
+            yield ChunkEntity(ent.text, ent.label_, ent.start_char + offset, ent.end_char + offset)
+
+
+def extract_named_entities_chunked(text: str, max_chars: int = NER_CHUNK_CHARS, batch_size: int = 8,
+                                   mode: str = SKILL_EXTRACTION_MODE) -> Dict[str, List[str]]:
+    """
+    Memory-bounded extract_named_entities for very long documents. The text is
+    split on section and paragraph boundaries into chunks of at most max_chars
+    and streamed through both pipelines, so at most `batch_size` chunk docs are
+    alive at once and spaCy's max_length never applies.
+    """
+    check_mode(mode)
+    if mode == "gazetteer":
+        return gazetteer_entities(text)
+
+    all_ents = list(iter_chunk_entities(get_spacy_md(), text, max_chars, batch_size))
+    nlp_custom = get_spacy_custom()
+    if nlp_custom:
+        all_ents += list(iter_chunk_entities(nlp_custom, text, max_chars, batch_size))
+
+    result = entities_from_spans(text, all_ents)
+    return merge_gazetteer_skills(text, result) if mode == "merged" else result
+
+
+def check_mode(mode: str) -> None:
+    if mode not in SKILL_EXTRACTION_MODES:
+        raise ValueError(f"Unknown skill extraction mode '{mode}'. Use one of: {', '.join(SKILL_EXTRACTION_MODES)}")
+
+
+def gazetteer_entities(text: str) -> Dict[str, List[str]]:
+    """Skills from the skill_map phrase index only (for bulk screening)."""
+    return {
+        "detected_skills": match_skills(text),
+        "certifications": [],
+        "education": [],
+        "name": []
+    }
+
+
+def merge_gazetteer_skills(text: str, result: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Adds gazetteer skill hits to an NER result."""
+    merged = dict(result)
+    merged["detected_skills"] = sorted(set(result["detected_skills"]) | set(match_skills(text)))
+    return merged
+
+
+def entities_from_docs(text: str, doc_md, doc_custom: Optional[object] = None) -> Dict[str, List[str]]:
+    """Turns the en_core_web_md and custom NER docs of `text` into skills, education, certifications and names."""
+    all_ents = list(doc_md.ents)
+    if doc_custom:
+        all_ents += list(doc_custom.ents)
+    return entities_from_spans(text, all_ents)
 
+
+def entities_from_spans(text: str, all_ents: Iterable) -> Dict[str, List[str]]:
+    """Buckets entity spans (anything with .text and .label_) found in `text`."""
     skills, certs, education, names = [], [], [], []
 
     def is_valid_entity(ent_text: str) -> bool:
@@ -54,10 +172,6 @@ def extract_named_entities(text: str) -> Dict[str, List[str]]:
             return False
         return True
 
-    all_ents = list(doc_md.ents)
-    if doc_custom:
-        all_ents += list(doc_custom.ents)
-
     for ent in all_ents:
         label = ent.label_.upper()
         ent_text = ent.text.strip().replace('\n', ' ').replace('\t', ' ').strip("•-•:,. ")
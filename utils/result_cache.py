@@ -0,0 +1,173 @@
+"""
+Content-addressed cache for full generate_recommendations results.
+
+Entries live in .cache/results/<sha256>.json. The key covers the normalized
+resume text, JD text, goal and an environment fingerprint (skill_map.json
+contents, the NER / embedding model versions, skill extraction settings and
+output options). When the fingerprint changes, every stored result is
+dropped. Entries expire after RESULT_CACHE_TTL seconds and the least
+recently used ones are evicted beyond RESULT_CACHE_MAX_ENTRIES.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+from typing import Dict, Optional
+
+from utils.config import (
+    CUSTOM_MODEL_PATH, SKILL_MAP_PATH, SPACY_MD_MODEL, EMBEDDING_MODEL_ID, SKILL_DAG_OUTPUT,
+    SKILL_EXTRACTION_MODE, NER_ONLY_PIPELINES,
+    RESULT_CACHE_DIR, RESULT_CACHE_TTL, RESULT_CACHE_MAX_ENTRIES, logger
+)
+
+FINGERPRINT_FILE = "fingerprint"
+
+
+# ---------- Keys ----------
+def normalize_text(text: Optional[str]) -> str:
+    """Collapses whitespace so re-extracted copies of the same file hash equally."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def package_version(name: str) -> str:
+    try:
+        from importlib.metadata import version
+        return version(name)
+    except Exception:
+        return "unknown"
+
+
+def model_dir_signature(path: str) -> str:
+    """Size and mtime of every file in a model directory (changes on retrain/copy)."""
+    entries = []
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            stat = os.stat(file_path)
+            entries.append(f"{os.path.relpath(file_path, path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(sorted(entries))
+
+
+def environment_fingerprint() -> str:
+    """Hash of everything besides the inputs that affects the analysis output."""
+    digest = hashlib.sha256()
+    with open(SKILL_MAP_PATH, "rb") as f:
+        digest.update(f.read())
+    digest.update(model_dir_signature(CUSTOM_MODEL_PATH).encode("utf-8"))
+    digest.update(f"{SPACY_MD_MODEL}=={package_version(SPACY_MD_MODEL)}".encode("utf-8"))
+    digest.update(EMBEDDING_MODEL_ID.encode("utf-8"))
+    # Skill extraction settings change matched / missing skills and the fit score
+    digest.update(f"extraction={SKILL_EXTRACTION_MODE};ner_only={NER_ONLY_PIPELINES}".encode("utf-8"))
+    # Output-shape options: results built under another setting have a different schema
+    digest.update(f"dag_output={SKILL_DAG_OUTPUT}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cache_key(resume_text: str, jd_text: Optional[str], goal: Optional[str], fingerprint: str) -> str:
+    payload = json.dumps([normalize_text(resume_text), normalize_text(jd_text), goal or "", fingerprint])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------- Storage ----------
+def _entry_path(key: str) -> str:
+    return os.path.join(RESULT_CACHE_DIR, f"{key}.json")
+
+
+def _entry_files():
+    try:
+        names = os.listdir(RESULT_CACHE_DIR)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(RESULT_CACHE_DIR, n) for n in names if n.endswith(".json")]
+
+
+def clear_cache() -> int:
+    """Deletes every cached result. Returns the number of entries removed."""
+    removed = 0
+    for path in _entry_files():
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def invalidate_if_stale(fingerprint: str) -> None:
+    """Drops all results when skill_map.json or a model changed since they were stored."""
+    os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+    marker = os.path.join(RESULT_CACHE_DIR, FINGERPRINT_FILE)
+    try:
+        with open(marker, "r", encoding="utf-8") as f:
+            previous = f.read().strip()
+    except FileNotFoundError:
+        previous = None
+
+    if previous == fingerprint:
+        return
+    if previous is not None:
+        logger.info(f"♻️ Skill map or model changed. Cleared {clear_cache()} cached results.")
+    _atomic_write(marker, fingerprint)
+
+
+def _atomic_write(path: str, content: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def get_cached_result(key: str) -> Optional[Dict]:
+    path = _entry_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"⚠️ Dropping unreadable cached result {key}: {e}")
+        os.remove(path)
+        return None
+
+    if time.time() - entry.get("created_at", 0) > RESULT_CACHE_TTL:
+        os.remove(path)
+        return None
+
+    os.utime(path)  # mtime doubles as last-access time for LRU eviction
+    return entry.get("result")
+
+
+def store_result(key: str, result: Dict) -> None:
+    os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+    _atomic_write(_entry_path(key), json.dumps({"created_at": time.time(), "result": result}, ensure_ascii=False))
+    evict(RESULT_CACHE_MAX_ENTRIES)
+
+
+def evict(max_entries: int) -> None:
+    """Removes the least recently used entries beyond `max_entries`."""
+    files = _entry_files()
+    if len(files) <= max_entries:
+        return
+
+    def mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except FileNotFoundError:
+            return 0
+
+    for path in sorted(files, key=mtime)[:len(files) - max_entries]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    print(f"Cleared {clear_cache()} cached results from {RESULT_CACHE_DIR}")
@@ -0,0 +1,138 @@
+"""
+Approximate nearest-neighbour index over role / job-title embeddings.
+
+An IVF-Flat index in plain numpy: vectors are clustered with k-means into
+`n_lists` inverted lists, and a query only scores the vectors in the
+`n_probe` lists whose centroids are closest. Vectors are expected to be
+L2-normalized, so the dot product is the cosine similarity.
+"""
+import os
+import json
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from utils.config import ROLE_ANN_DIR, ROLE_ANN_NPROBE, logger
+from utils.role_embeddings import load_role_matrix, matrix_key, top_k
+
+
+def kmeans(vectors: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids (unit length) for normalized vectors."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(n_lists):
+            members = vectors[assignments == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+            else:
+                # Re-seed an empty list with a random vector
+                centroids[c] = vectors[rng.integers(len(vectors))]
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+
+    return centroids.astype(np.float32)
+
+
+class RoleANNIndex:
+    """IVF-Flat index supporting build, incremental add, search, save and load."""
+
+    def __init__(self, centroids: np.ndarray, names: Optional[List[str]] = None,
+                 vectors: Optional[np.ndarray] = None, assignments: Optional[np.ndarray] = None):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.names: List[str] = list(names or [])
+        dim = self.centroids.shape[1]
+        self.vectors = np.asarray(vectors, dtype=np.float32) if vectors is not None else np.empty((0, dim), np.float32)
+        self.assignments = np.asarray(assignments, dtype=np.int64) if assignments is not None else np.empty(0, np.int64)
+        self._rebuild_lists()
+
+    # ---------- Construction ----------
+    @classmethod
+    def build(cls, names: List[str], vectors: np.ndarray, n_lists: Optional[int] = None) -> "RoleANNIndex":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n_lists = n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+        index = cls(kmeans(vectors, n_lists))
+        index.add(names, vectors)
+        return index
+
+    def add(self, names: List[str], vectors: np.ndarray) -> None:
+        """Adds vectors to their nearest existing list (centroids are not retrained)."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.centroids.shape[1])
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+        self.names.extend(names)
+        self.vectors = np.vstack([self.vectors, vectors])
+        self.assignments = np.concatenate([self.assignments, assignments])
+        self._rebuild_lists()
+
+    def _rebuild_lists(self) -> None:
+        order = np.argsort(self.assignments, kind="stable")
+        bounds = np.searchsorted(self.assignments[order], np.arange(len(self.centroids) + 1))
+        self._lists = [order[bounds[c]:bounds[c + 1]] for c in range(len(self.centroids))]
+
+    # ---------- Query ----------
+    def search(self, query: np.ndarray, k: int, n_probe: int = ROLE_ANN_NPROBE) -> List[Tuple[int, float]]:
+        """(row, score) of the k best vectors among the n_probe closest lists, best first."""
+        query = np.asarray(query, dtype=np.float32)
+        probes = top_k(self.centroids @ query, n_probe)
+        candidates = np.concatenate([self._lists[c] for c in probes]) if len(probes) else np.empty(0, np.int64)
+        if not len(candidates):
+            return []
+        scores = self.vectors[candidates] @ query
+        best = top_k(scores, k)
+        return [(int(candidates[i]), float(scores[i])) for i in best]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ---------- Persistence ----------
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique per call: threads of one process may save at the same time
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, centroids=self.centroids, vectors=self.vectors, assignments=self.assignments,
+                         names=np.array(json.dumps(self.names, ensure_ascii=False)))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "RoleANNIndex":
+        with np.load(path) as data:
+            return cls(data["centroids"], json.loads(str(data["names"])), data["vectors"], data["assignments"])
+
+
+_indexes = {}
+
+
+def load_role_ann_index(skill_map) -> RoleANNIndex:
+    """ANN index over the skill map's role embeddings, built once and saved under .cache/role_ann."""
+    role_names, role_matrix = load_role_matrix(skill_map)
+    key = matrix_key(role_names)
+    if key in _indexes:
+        return _indexes[key]
+
+    path = os.path.join(ROLE_ANN_DIR, f"{key}.npz")
+    index = None
+    if os.path.exists(path):
+        try:
+            index = RoleANNIndex.load(path)
+            if index.names != role_names:
+                index = None
+        except Exception as e:
+            logger.warning(f"⚠️ Unreadable role ANN index at {path}: {e}")
+            index = None
+
+    if index is None:
+        index = RoleANNIndex.build(role_names, np.asarray(role_matrix))
+        index.save(path)
+        logger.info(f"✅ Built role ANN index: {len(index)} roles in {len(index.centroids)} lists")
+
+    _indexes[key] = index
+    return index
@@ -0,0 +1,96 @@
+"""
+Persisted role-name embedding matrix for role_suggestor.
+
+Role names from the skill map are encoded once with the shared MiniLM model,
+L2-normalized and saved as .cache/role_embeddings/<key>.npy next to a JSON
+list of the role names. The key hashes the role names and the model / backend, so
+the matrix is rebuilt automatically when either changes. Later loads
+memory-map the file, and ranking becomes one matrix-vector product.
+"""
+import os
+import json
+import hashlib
+import tempfile
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils.config import ROLE_EMBEDDINGS_DIR, EMBEDDING_MODEL_ID, logger
+from utils.embedding_store import encode_cached
+
+_matrices: Dict[str, Tuple[List[str], np.ndarray]] = {}
+
+
+def matrix_key(role_names: List[str], model_name: str = EMBEDDING_MODEL_ID) -> str:
+    payload = json.dumps({"model": model_name, "roles": role_names}, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_normalized(texts) -> np.ndarray:
+    """
+    MiniLM embeddings as unit-length float32 rows (cosine similarity == dot
+    product), served from the persistent embedding store when possible.
+    A single string gives a single vector.
+    """
+    if isinstance(texts, str):
+        return encode_cached([texts])[0]
+    return encode_cached(list(texts))
+
+
+def _save(path: str, names_path: str, role_names: List[str], matrix: np.ndarray) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Temp files unique per call: threads of one process may save at the same time
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    tmp_names = None
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, matrix)
+        fd, tmp_names = tempfile.mkstemp(dir=os.path.dirname(names_path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(role_names, f, ensure_ascii=False)
+        os.replace(tmp_names, names_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        for leftover in (tmp_path, tmp_names):
+            if leftover and os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+
+
+def load_role_matrix(skill_map: Dict[str, Dict]) -> Tuple[List[str], np.ndarray]:
+    """(role_names, normalized embedding matrix) for the roles in `skill_map`."""
+    role_names = list(skill_map.keys())
+    key = matrix_key(role_names)
+    if key in _matrices:
+        return _matrices[key]
+
+    path = os.path.join(ROLE_EMBEDDINGS_DIR, f"{key}.npy")
+    names_path = os.path.join(ROLE_EMBEDDINGS_DIR, f"{key}.json")
+
+    matrix = None
+    if os.path.exists(path) and os.path.exists(names_path):
+        try:
+            with open(names_path, "r", encoding="utf-8") as f:
+                saved_names = json.load(f)
+            if saved_names == role_names:
+                matrix = np.load(path, mmap_mode="r")
+        except Exception as e:
+            logger.warning(f"⚠️ Unreadable role embeddings at {path}: {e}")
+
+    if matrix is None:
+        logger.info(f"⏳ Encoding {len(role_names)} role names...")
+        matrix = encode_normalized(role_names)
+        _save(path, names_path, role_names, matrix)
+        matrix = np.load(path, mmap_mode="r")
+
+    _matrices[key] = (role_names, matrix)
+    return _matrices[key]
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, via argpartition."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=int)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
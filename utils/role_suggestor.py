@@ -1,41 +1,45 @@
 from typing import List, Dict, Tuple
-from sentence_transformers import SentenceTransformer, util
-import os
-import requests
-
-# Load model once
-model = SentenceTransformer("all-MiniLM-L6-v2")
-
-# Load API keys from environment
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-# Temporary in-memory cache (can be replaced with Redis or DB)
+from utils.config import ROLE_ANN_ENABLED, logger
+from utils.content_store import get_content_store
+from utils.llm_client import chat
+from utils.single_flight import single_flight
+from utils.role_embeddings import load_role_matrix, encode_normalized, top_k
+from utils.role_ann_index import load_role_ann_index
+
+# In-memory cache in front of the shared content store
 role_description_cache: Dict[str, str] = {}
+ROLE_DESCRIPTION_NAMESPACE = "role_description"
+
 
+def rank_roles(query_embedding, skill_map: Dict[str, Dict], k: int, use_ann: bool = ROLE_ANN_ENABLED) -> List[Tuple[str, float]]:
+    """Top-k (role, cosine score) pairs, exact by default or through the ANN index."""
+    if use_ann:
+        index = load_role_ann_index(skill_map)
+        ranked = [(index.names[i], score) for i, score in index.search(query_embedding, k)]
+        # The probed lists can hold fewer than k roles (or none); the exact search always fills k
+        if len(ranked) >= min(k, len(index)):
+            return ranked
 
-def detect_role_from_jd(jd_text: str, skill_map: Dict[str, Dict]) -> str:
-    role_names = list(skill_map.keys())
-    role_embeddings = model.encode(role_names, convert_to_tensor=True)
-    jd_embedding = model.encode(jd_text, convert_to_tensor=True)
+    role_names, role_matrix = load_role_matrix(skill_map)
+    scores = role_matrix @ query_embedding
+    return [(role_names[i], float(scores[i])) for i in top_k(scores, k)]
 
-    scores = util.cos_sim(jd_embedding, role_embeddings)[0]
-    ranked_roles = sorted(zip(role_names, scores), key=lambda x: x[1], reverse=True)
 
-    return ranked_roles[0][0]
+def detect_role_from_jd(jd_text: str, skill_map: Dict[str, Dict], use_ann: bool = ROLE_ANN_ENABLED) -> str:
+    jd_embedding = encode_normalized(jd_text)
+    return rank_roles(jd_embedding, skill_map, 1, use_ann)[0][0]
 
 
-def get_alternate_roles(user_summary: str, current_role: str, skill_map: Dict[str, Dict], top_n: int = 3) -> List[Tuple[str, float]]:
-    role_names = list(skill_map.keys())
-    role_embeddings = model.encode(role_names, convert_to_tensor=True)
-    user_embedding = model.encode(user_summary, convert_to_tensor=True)
+def get_alternate_roles(user_summary: str, current_role: str, skill_map: Dict[str, Dict], top_n: int = 3,
+                        use_ann: bool = ROLE_ANN_ENABLED) -> List[Tuple[str, float]]:
+    user_embedding = encode_normalized(user_summary)
 
-    scores = util.cos_sim(user_embedding, role_embeddings)[0]
-    ranked_roles = sorted(zip(role_names, scores), key=lambda x: x[1], reverse=True)
+    # One extra candidate in case the current role ranks in the top n
+    ranked = rank_roles(user_embedding, skill_map, top_n + 1, use_ann)
 
     suggestions = [
-        (role, round(score.item() * 100, 2))
-        for role, score in ranked_roles if role != current_role
+        (role, round(score * 100, 2))
+        for role, score in ranked if role != current_role
     ]
 
     return suggestions[:top_n]
@@ -45,63 +49,49 @@ def get_alternate_roles(user_summary: str, current_role: str, skill_map: Dict[st
 
 def get_role_description(role: str) -> str:
     """
-    Returns a description of the role using OpenRouter or Gemini fallback.
+    Returns a description of the role from the shared LLM client (OpenRouter / Gemini).
     """
     # Check cache
     if role in role_description_cache:
         return role_description_cache[role]
+    stored = _stored_role_description(role)
+    if stored:
+        role_description_cache[role] = stored
+        return stored
 
+    # Concurrent misses for the same role (threads or workers) share one request
+    return single_flight(f"{ROLE_DESCRIPTION_NAMESPACE}:{role}", lambda: _generate_role_description(role),
+                         recheck=lambda: _stored_role_description(role))
+
+
+def _stored_role_description(role: str):
+    try:
+        return get_content_store().get(ROLE_DESCRIPTION_NAMESPACE, role)
+    except Exception as e:
+        logger.warning(f"⚠️ Content cache unavailable: {e}")
+        return None
+
+
+def _generate_role_description(role: str) -> str:
     prompt = f"Give a short, 2-3 sentence professional description of the job role: {role}"
 
     try:
-        description = fetch_from_openrouter(prompt)
+        description = chat(prompt, system="You are an AI that describes job roles professionally.", hedge=True)
     except Exception as e:
-        print(f"[OpenRouter failed] {e}")
-        try:
-            description = fetch_from_gemini(prompt)
-        except Exception as ge:
-            print(f"[Gemini fallback failed] {ge}")
-            description = "No description available at the moment."
+        print(f"[Role description failed] {e}")
+        # Remembered for this process only, so a later run can still fill it in
+        role_description_cache[role] = "No description available at the moment."
+        return role_description_cache[role]
 
     # Cache it
     role_description_cache[role] = description
+    try:
+        get_content_store().put(ROLE_DESCRIPTION_NAMESPACE, role, description)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not cache role description: {e}")
     return description
 
 
-def fetch_from_openrouter(prompt: str) -> str:
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "HTTP-Referer": "https://chat.openai.com",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "model": "openai/gpt-3.5-turbo",
-        "messages": [
-            {"role": "system", "content": "You are an AI that describes job roles professionally."},
-            {"role": "user", "content": prompt}
-        ]
-    }
-
-    response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload)
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"].strip()
-
-
-def fetch_from_gemini(prompt: str) -> str:
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={GEMINI_API_KEY}"
-    payload = {
-        "contents": [
-            {"parts": [{"text": prompt}]}
-        ]
-    }
-
-    headers = {"Content-Type": "application/json"}
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
-    return response.json()["candidates"][0]["content"]["parts"][0]["text"].strip()
-
-
 # --- Combined Output Function ---
 
 def get_alternate_roles_with_descriptions(user_summary: str, current_role: str, skill_map: Dict[str, Dict], top_n: int = 3) -> List[Tuple[str, float, str]]:
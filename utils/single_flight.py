@@ -0,0 +1,125 @@
+"""
+Single-flight coalescing for expensive generations (LLM calls).
+
+When many callers miss the cache for the same key at once, only one of them
+generates. Two layers handle this:
+- In-process: the first thread becomes the leader for the key. Later
+  threads wait for its result, or for its exception.
+- Cross-process (SINGLE_FLIGHT_CROSS_PROCESS): the leader also takes an
+  flock on .cache/locks/<sha1(key)>.lock. A leader in another worker blocks
+  on that lock.
+
+Once a leader has the lock, it always runs `recheck` (usually a cache read)
+before generating, as in double-checked locking. A caller that missed the
+cache just before another leader stored its result therefore reuses that
+result.
+
+A leader that dies releases its flock with the process. A leader that hangs
+is waited on for at most SINGLE_FLIGHT_LOCK_TIMEOUT seconds.
+single_flight_stats() counts executions and coalesced calls.
+"""
+import os
+import time
+import fcntl
+import hashlib
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, Optional, TypeVar
+
+from utils.config import SINGLE_FLIGHT_CROSS_PROCESS, SINGLE_FLIGHT_LOCK_DIR, SINGLE_FLIGHT_LOCK_TIMEOUT, logger
+
+T = TypeVar("T")
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+_flights: Dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+_stats = {"executed": 0, "coalesced_local": 0, "coalesced_cached": 0, "lock_timeouts": 0}
+
+
+def _count(name: str) -> None:
+    with _flights_lock:
+        _stats[name] += 1
+
+
+def single_flight_stats() -> Dict[str, int]:
+    with _flights_lock:
+        stats = dict(_stats)
+    stats["coalesced"] = stats["coalesced_local"] + stats["coalesced_cached"]
+    return stats
+
+
+@contextmanager
+def file_lock(key: str, timeout: float = SINGLE_FLIGHT_LOCK_TIMEOUT) -> Iterator[None]:
+    """Exclusive flock for `key`. Proceeds unlocked after `timeout`."""
+    os.makedirs(SINGLE_FLIGHT_LOCK_DIR, exist_ok=True)
+    path = os.path.join(SINGLE_FLIGHT_LOCK_DIR, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.lock")
+    with open(path, "w") as f:
+        locked = False
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    _count("lock_timeouts")
+                    logger.warning(f"⚠️ Gave up waiting for the generation lock on {key}")
+                    break
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if locked:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def single_flight(key: str, fn: Callable[[], T], recheck: Optional[Callable[[], Optional[T]]] = None,
+                  cross_process: bool = SINGLE_FLIGHT_CROSS_PROCESS) -> T:
+    """
+    Result of fn() with at most one execution per key in flight. `recheck`
+    returns the cached value (or None). The leader runs it once it holds the
+    lock, so a result stored meanwhile by another thread or worker is reused.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+        else:
+            _stats["coalesced_local"] += 1
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _lead(key, fn, recheck, cross_process)
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+
+def _lead(key: str, fn: Callable[[], T], recheck: Optional[Callable[[], Optional[T]]], cross_process: bool) -> T:
+    with file_lock(key) if cross_process else nullcontext():
+        if recheck is not None:
+            cached = recheck()
+            if cached is not None:
+                _count("coalesced_cached")
+                return cached
+        _count("executed")
+        return fn()
@@ -0,0 +1,250 @@
+"""
+Global skill dependency graph merged from skill_map.json.
+
+Every role lists curated `dependencies` (skill -> prerequisites). They are
+merged into one graph keyed by lowercase skill name, so the skill graph can
+draw its edges locally and only ask an LLM about skills the map never
+covers. A skill counts as covered when some role lists its dependencies, or
+when it only ever appears as a prerequisite (a curated foundation such as
+"JavaScript" or "Python").
+
+The merged graph is compiled into a SkillDAG (cycles broken, nodes numbered
+in topological order, ancestor bitsets, depth ranks) and saved to
+.cache/skill_dag.json. "What must I learn first, and in which order" is then
+an OR of a few bitsets.
+
+    python -m utils.skill_dependencies kubernetes redux [--known linux javascript]
+"""
+import os
+import json
+import hashlib
+import argparse
+import tempfile
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from utils.config import SKILL_DAG_PATH, logger
+from utils.utils import load_skill_map
+
+
+class DependencyGraph(NamedTuple):
+    prerequisites: Dict[str, List[str]]  # lowercase skill -> canonical prerequisite names
+    names: Dict[str, str]                # lowercase skill -> canonical name (first spelling seen)
+
+
+_graph: Optional[DependencyGraph] = None
+_dag: Optional["SkillDAG"] = None
+
+
+def build_dependency_graph(skill_map: Dict[str, Dict]) -> DependencyGraph:
+    prerequisites: Dict[str, List[str]] = {}
+    names: Dict[str, str] = {}
+
+    def canonical(skill: str) -> str:
+        skill = skill.strip()
+        return names.setdefault(skill.lower(), skill)
+
+    for role_data in skill_map.values():
+        for skill, prereqs in (role_data.get("dependencies") or {}).items():
+            merged = prerequisites.setdefault(canonical(skill).lower(), [])
+            seen = {p.lower() for p in merged}
+            for prereq in prereqs:
+                name = canonical(prereq)
+                if name.lower() not in seen and name.lower() != skill.strip().lower():
+                    merged.append(name)
+                    seen.add(name.lower())
+
+    # Prerequisites that never list their own dependencies are foundations
+    for key in names:
+        prerequisites.setdefault(key, [])
+    return DependencyGraph(prerequisites, names)
+
+
+def get_dependency_graph() -> DependencyGraph:
+    global _graph
+    if _graph is None:
+        _graph = build_dependency_graph(load_skill_map())
+    return _graph
+
+
+def local_prerequisites(skill: str) -> Optional[List[str]]:
+    """Curated prerequisites for `skill`, or None when skill_map.json does not cover it."""
+    return get_dependency_graph().prerequisites.get(skill.strip().lower())
+
+
+# ---------- Compiled DAG ----------
+class SkillDAG:
+    """
+    Skills numbered in topological order (every prerequisite has a lower
+    index than the skills that need it). ancestors[i] is a bitset of all
+    transitive prerequisites of skill i, so the set bits of any union are
+    already a valid learning order.
+    """
+
+    def __init__(self, names: List[str], prerequisites: List[List[int]], ancestors: List[int],
+                 ranks: List[int], cycles: List[Tuple[str, str]]):
+        self.names = names                  # position -> canonical name
+        self.prerequisites = prerequisites  # position -> direct prerequisite positions
+        self.ancestors = ancestors          # position -> bitset of transitive prerequisites
+        self.ranks = ranks                  # position -> longest prerequisite chain below it
+        self.cycles = cycles                # (prerequisite, skill) edges dropped to break cycles
+        self.index = {name.lower(): i for i, name in enumerate(names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def compile(cls, graph: DependencyGraph) -> "SkillDAG":
+        keys = list(graph.prerequisites)
+        position = {key: i for i, key in enumerate(keys)}
+        edges = [[position[p.lower()] for p in graph.prerequisites[key]] for key in keys]
+
+        # Iterative DFS along prerequisite edges: post-order is a topological
+        # order, and an edge back to a node still on the stack closes a cycle
+        state = [0] * len(keys)  # 0 = new, 1 = on stack, 2 = done
+        kept: List[List[int]] = [[] for _ in keys]
+        order, cycles = [], []
+        for root in range(len(keys)):
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [(root, iter(edges[root]))]
+            while stack:
+                node, pending = stack[-1]
+                for prereq in pending:
+                    if state[prereq] == 1:
+                        cycles.append((graph.names[keys[prereq]], graph.names[keys[node]]))
+                        continue
+                    kept[node].append(prereq)
+                    if state[prereq] == 0:
+                        state[prereq] = 1
+                        stack.append((prereq, iter(edges[prereq])))
+                        break
+                else:
+                    state[node] = 2
+                    order.append(node)
+                    stack.pop()
+
+        for prereq, skill in cycles:
+            logger.warning(f"⚠️ Dependency cycle in skill_map.json: dropped {prereq} -> {skill}")
+
+        renumber = {old: new for new, old in enumerate(order)}
+        prerequisites = [sorted(renumber[p] for p in kept[old]) for old in order]
+        ancestors, ranks = [], []
+        for prereqs in prerequisites:
+            bits = 0
+            for p in prereqs:
+                bits |= ancestors[p] | (1 << p)
+            ancestors.append(bits)
+            ranks.append(1 + max(ranks[p] for p in prereqs) if prereqs else 0)
+        return cls([graph.names[keys[old]] for old in order], prerequisites, ancestors, ranks, cycles)
+
+    # ---------- Queries ----------
+    def rank(self, skill: str) -> Optional[int]:
+        i = self.index.get(skill.strip().lower())
+        return None if i is None else self.ranks[i]
+
+    def _names(self, bits: int) -> List[str]:
+        names = []
+        while bits:
+            low = bits & -bits
+            names.append(self.names[low.bit_length() - 1])
+            bits ^= low
+        return names
+
+    def _mask(self, skills: Iterable[str]) -> int:
+        bits = 0
+        for skill in skills:
+            i = self.index.get(skill.strip().lower())
+            if i is not None:
+                bits |= 1 << i
+        return bits
+
+    def prerequisites_of(self, skill: str, known: Iterable[str] = ()) -> List[str]:
+        """Transitive prerequisites of `skill` not in `known`, in learning order."""
+        i = self.index.get(skill.strip().lower())
+        if i is None:
+            return []
+        return self._names(self.ancestors[i] & ~self._mask(known))
+
+    def learning_order(self, skills: Iterable[str], known: Iterable[str] = ()) -> List[str]:
+        """
+        `skills` plus every prerequisite they transitively need, minus `known`,
+        prerequisites first. Skills outside the DAG are appended as given.
+        """
+        bits, unknown = 0, []
+        for skill in skills:
+            i = self.index.get(skill.strip().lower())
+            if i is None:
+                unknown.append(skill)
+            else:
+                bits |= self.ancestors[i] | (1 << i)
+        return self._names(bits & ~self._mask(known)) + unknown
+
+    def sort_skills(self, skills: Iterable[str]) -> List[str]:
+        """`skills` as given, reordered so prerequisites come first (skills outside the DAG last)."""
+        return sorted(skills, key=lambda s: self.index.get(s.strip().lower(), len(self.names)))
+
+    # ---------- Persistence ----------
+    def to_dict(self, source: str) -> Dict:
+        return {
+            "source": source, "names": self.names, "prerequisites": self.prerequisites,
+            "ancestors": [format(bits, "x") for bits in self.ancestors], "ranks": self.ranks, "cycles": self.cycles
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SkillDAG":
+        return cls(data["names"], data["prerequisites"], [int(bits, 16) for bits in data["ancestors"]],
+                   data["ranks"], [tuple(edge) for edge in data["cycles"]])
+
+
+def graph_source(graph: DependencyGraph) -> str:
+    payload = json.dumps(graph.prerequisites, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def get_skill_dag(path: str = SKILL_DAG_PATH) -> SkillDAG:
+    """Compiled DAG for the current skill map, loaded from `path` unless the skill map changed."""
+    global _dag
+    if _dag is not None:
+        return _dag
+
+    graph = get_dependency_graph()
+    source = graph_source(graph)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("source") == source:
+            _dag = SkillDAG.from_dict(data)
+            return _dag
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"⚠️ Unreadable skill DAG at {path}: {e}")
+
+    _dag = SkillDAG.compile(graph)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(_dag.to_dict(source), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"✅ Compiled skill DAG with {len(_dag)} skills to {path}")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not save skill DAG: {e}")
+    return _dag
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Learning order from the skill_map.json dependency DAG")
+    parser.add_argument("skills", nargs="+", help="Skills to learn")
+    parser.add_argument("--known", nargs="*", default=[], help="Skills already known")
+    args = parser.parse_args()
+
+    dag = get_skill_dag()
+    for step, skill in enumerate(dag.learning_order(args.skills, args.known), 1):
+        print(f"{step:>3}. {skill}")
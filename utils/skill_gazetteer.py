@@ -0,0 +1,180 @@
+"""
+Gazetteer fast path for skill extraction.
+
+Every skill in skill_map.json (must-have, optional and dependency skills) plus
+the ALIAS_MAP spellings is compiled into a phrase index keyed by token
+sequence. match_skills() finds canonical skills in one left-to-right pass over
+the text, taking the longest phrase at each position. The index is saved to
+.cache/skill_gazetteer.json and rebuilt automatically when skill_map.json or
+ALIAS_MAP changes.
+
+    python -m utils.skill_gazetteer [--rebuild] [file ...]
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils.config import SKILL_MAP_PATH, GAZETTEER_PATH, logger
+from utils.utils import load_skill_map
+
+INDEX_FORMAT = 1
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Single-word skills this short ("Go", "R", "UX") only match with their exact casing
+CASE_SENSITIVE_MAX_LEN = 2
+
+# (index, first tokens of its phrases), published together so readers never see one without the other
+_loaded: Optional[Tuple[Dict, Set[str]]] = None
+_load_lock = threading.Lock()
+
+
+def tokenize(text: str) -> List[str]:
+    """Word runs and individual punctuation marks, so 'Node.js' -> ['Node', '.', 'js']."""
+    return TOKEN_PATTERN.findall(text)
+
+
+def phrase_key(tokens: List[str]) -> str:
+    return " ".join(token.lower() for token in tokens)
+
+
+def collect_skills(skill_map: Dict) -> List[str]:
+    skills = set()
+    for role_data in skill_map.values():
+        skills.update(role_data.get("must_have", []))
+        skills.update(role_data.get("optional", []))
+        for skill, prereqs in role_data.get("dependencies", {}).items():
+            skills.add(skill)
+            skills.update(prereqs)
+    return sorted(s.strip() for s in skills if s.strip())
+
+
+def index_version() -> str:
+    from utils.nlp_utils import ALIAS_MAP
+
+    digest = hashlib.sha256()
+    with open(SKILL_MAP_PATH, "rb") as f:
+        digest.update(f.read())
+    digest.update(json.dumps(ALIAS_MAP, sort_keys=True).encode("utf-8"))
+    digest.update(str(INDEX_FORMAT).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_index() -> Dict:
+    """Compiles skill_map.json and ALIAS_MAP into a phrase -> canonical skill index."""
+    from utils.nlp_utils import ALIAS_MAP, normalize_skill
+
+    phrases, case_sensitive = {}, {}
+
+    for skill in collect_skills(load_skill_map()):
+        tokens = tokenize(skill)
+        if not tokens:
+            continue
+        key = phrase_key(tokens)
+        phrases[key] = normalize_skill(skill)
+        if len(tokens) == 1 and len(skill) <= CASE_SENSITIVE_MAX_LEN:
+            case_sensitive[key] = skill
+
+    for alias, canonical in ALIAS_MAP.items():
+        tokens = tokenize(alias)
+        if tokens:
+            phrases[phrase_key(tokens)] = canonical
+
+    return {
+        "version": index_version(),
+        "max_tokens": max((len(key.split(" ")) for key in phrases), default=0),
+        "phrases": phrases,
+        "case_sensitive": case_sensitive
+    }
+
+
+def save_index(index: Dict, path: str = GAZETTEER_PATH) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique per call: threads of one process may save at the same time
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_index(path: str = GAZETTEER_PATH, rebuild: bool = False) -> Dict:
+    """Loads the saved index, rebuilding it if missing or built from an older skill map."""
+    return _load(path, rebuild)[0]
+
+
+def _load(path: str = GAZETTEER_PATH, rebuild: bool = False) -> Tuple[Dict, Set[str]]:
+    global _loaded
+
+    loaded = _loaded
+    if loaded is not None and not rebuild:
+        return loaded
+
+    with _load_lock:
+        if _loaded is not None and not rebuild:
+            return _loaded
+
+        index = None
+        version = index_version()
+        if not rebuild and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    saved = json.load(f)
+                if saved.get("version") == version:
+                    index = saved
+            except Exception as e:
+                logger.warning(f"⚠️ Unreadable skill gazetteer at {path}: {e}")
+
+        if index is None:
+            index = build_index()
+            save_index(index, path)
+            logger.info(f"✅ Built skill gazetteer with {len(index['phrases'])} phrases at {path}")
+
+        _loaded = (index, {key.split(" ")[0] for key in index["phrases"]})
+        return _loaded
+
+
+def match_skills(text: str) -> List[str]:
+    """Canonical skills found in `text`, sorted and deduplicated."""
+    index, first_tokens = _load()
+    phrases, case_sensitive, max_tokens = index["phrases"], index["case_sensitive"], index["max_tokens"]
+
+    tokens = tokenize(text)
+    lowered = [token.lower() for token in tokens]
+    found = set()
+
+    i = 0
+    while i < len(tokens):
+        if lowered[i] not in first_tokens:
+            i += 1
+            continue
+        for n in range(min(max_tokens, len(tokens) - i), 0, -1):
+            key = " ".join(lowered[i:i + n])
+            if key not in phrases:
+                continue
+            if n == 1 and key in case_sensitive and tokens[i] != case_sensitive[key]:
+                continue
+            found.add(phrases[key])
+            i += n
+            break
+        else:
+            i += 1
+
+    return sorted(found)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    index = load_index(rebuild="--rebuild" in args)
+    print(f"{len(index['phrases'])} phrases (longest {index['max_tokens']} tokens), version {index['version'][:12]}")
+
+    for file_path in (a for a in args if a != "--rebuild"):
+        with open(file_path, "r", encoding="utf-8") as f:
+            print(f"{file_path}: {', '.join(match_skills(f.read()))}")
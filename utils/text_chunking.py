@@ -0,0 +1,61 @@
+"""
+Splits long documents into bounded chunks on natural boundaries.
+
+Chunks break at section headings and blank lines first, then at single line
+breaks, and only as a last resort at whitespace, so entities are almost never
+cut in half. Every chunk carries its character offset into the original text.
+"""
+import re
+from typing import Iterator, Tuple
+
+# Blank lines, or a line break followed by a short heading such as "Experience" / "SKILLS:"
+SECTION_BREAK = re.compile(r"\n\s*\n|\n(?=[A-Z][A-Za-z &/]{2,40}:?\s*\n)")
+
+
+def _split_at(text: str, offset: int, pattern: str) -> Iterator[Tuple[int, str]]:
+    """Pieces of `text` that end right after each match of `pattern`, with absolute offsets."""
+    start = 0
+    for match in re.finditer(pattern, text):
+        yield offset + start, text[start:match.end()]
+        start = match.end()
+    if start < len(text):
+        yield offset + start, text[start:]
+
+
+def _pieces(text: str, max_chars: int) -> Iterator[Tuple[int, str]]:
+    """Section/paragraph pieces, each at most max_chars long."""
+    for offset, paragraph in _split_at(text, 0, SECTION_BREAK.pattern):
+        if len(paragraph) <= max_chars:
+            yield offset, paragraph
+            continue
+        for line_offset, line in _split_at(paragraph, offset, r"\n"):
+            if len(line) <= max_chars:
+                yield line_offset, line
+                continue
+            # One enormous line: cut at the last whitespace before the limit
+            start = 0
+            while start < len(line):
+                end = min(start + max_chars, len(line))
+                if end < len(line):
+                    space = line.rfind(" ", start, end)
+                    end = space + 1 if space > start else end
+                yield line_offset + start, line[start:end]
+                start = end
+
+
+def iter_chunks(text: str, max_chars: int) -> Iterator[Tuple[int, str]]:
+    """
+    Yields (offset, chunk) pairs covering `text` in order, packing consecutive
+    pieces together while the chunk stays within max_chars.
+    """
+    chunk_offset, parts, size = 0, [], 0
+    for offset, piece in _pieces(text, max_chars):
+        if parts and size + len(piece) > max_chars:
+            yield chunk_offset, "".join(parts)
+            parts, size = [], 0
+        if not parts:
+            chunk_offset = offset
+        parts.append(piece)
+        size += len(piece)
+    if parts:
+        yield chunk_offset, "".join(parts)
@@ -0,0 +1,205 @@
+"""
+Pre-generates the LLM-backed catalog content for every skill and role in skill_map.json.
+
+    python warm_cache.py [--only learning graph roles] [--workers 8]
+                         [--rate openrouter=60 --rate gemini=30] [--max-attempts 3] [--force] [--report coverage.json]
+
+Three kinds of content are covered:
+- learning: learning paths and project ideas per skill (content store)
+- graph: skill descriptions, plus prerequisites for skills the skill map
+  does not cover (batched prompts, graph metadata cache)
+- roles: role descriptions (content store)
+
+Items run concurrently on a thread pool. Each provider gets its own
+requests-per-minute cap. Only content missing from the caches is
+generated, so an interrupted run resumes where it stopped. Every item's
+outcome and attempt count are also checkpointed in the content store.
+Items that failed --max-attempts times in earlier runs are skipped until
+--force is given. The run ends with a coverage report that is computed
+from the caches themselves.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Callable, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # Ensure local imports
+
+from utils.config import GRAPH_METADATA_BATCH_SIZE, SKILL_GRAPH_OFFLINE, logger
+from utils.utils import load_skill_map
+from utils.content_store import get_content_store
+from utils.llm_client import provider_stats, set_rate_limit
+from utils.single_flight import single_flight_stats
+from utils.learning_project_generator import generate_learning_and_projects, load_many_from_cache
+from utils.graph_builder import prefetch_metadata, load_persisted_metadata
+from utils.role_suggestor import get_role_description, ROLE_DESCRIPTION_NAMESPACE
+from utils.skill_dependencies import local_prerequisites
+
+KINDS = ("learning", "graph", "roles")
+CHECKPOINT_NAMESPACE = "warm_cache"
+
+
+# ---------- Catalog ----------
+def catalog_skills(skill_map: Dict[str, Dict]) -> List[str]:
+    """Every skill named anywhere in the skill map, first spelling wins."""
+    names: Dict[str, str] = {}
+    for role_data in skill_map.values():
+        dependencies = role_data.get("dependencies") or {}
+        for skill in [*role_data.get("must_have", []), *role_data.get("optional", []), *dependencies,
+                      *(p for prereqs in dependencies.values() for p in prereqs)]:
+            names.setdefault(skill.strip().lower(), skill.strip())
+    return sorted(names.values(), key=str.lower)
+
+
+# ---------- Coverage (read from the caches, not the checkpoint) ----------
+def covered_learning(skills: List[str]) -> set:
+    return set(load_many_from_cache(skills))
+
+
+def covered_graph(skills: List[str]) -> set:
+    data = load_persisted_metadata()
+    return {
+        skill for skill in skills
+        if skill.lower() in data["descriptions"]
+        and (local_prerequisites(skill) is not None or skill.lower() in data["prerequisites"])
+    }
+
+
+def covered_roles(roles: List[str]) -> set:
+    return set(get_content_store().get_many(ROLE_DESCRIPTION_NAMESPACE, roles))
+
+
+# ---------- Work items ----------
+def learning_item(skill: str) -> List[str]:
+    return [skill] if generate_learning_and_projects(skill) else []
+
+
+def graph_item(skills: List[str]) -> List[str]:
+    prefetch_metadata(skills)
+    return sorted(covered_graph(skills))
+
+
+def role_item(role: str) -> List[str]:
+    get_role_description(role)
+    return sorted(covered_roles([role]))
+
+
+def build_items(todo: Dict[str, List[str]]) -> List[Tuple[str, List[str], Callable]]:
+    """(kind, names, work) per item; graph skills are grouped into batched prompts."""
+    items = [("learning", [s], lambda s=s: learning_item(s)) for s in todo.get("learning", [])]
+    missing = todo.get("graph", [])
+    size = max(1, GRAPH_METADATA_BATCH_SIZE)
+    for start in range(0, len(missing), size):
+        batch = missing[start:start + size]
+        items.append(("graph", batch, lambda batch=batch: graph_item(batch)))
+    items += [("roles", [r], lambda r=r: role_item(r)) for r in todo.get("roles", [])]
+    return items
+
+
+def coverage(kinds: List[str], skills: List[str], roles: List[str]) -> Dict[str, set]:
+    return {
+        "learning": covered_learning(skills) if "learning" in kinds else set(),
+        "graph": covered_graph(skills) if "graph" in kinds else set(),
+        "roles": covered_roles(roles) if "roles" in kinds else set(),
+    }
+
+
+# ---------- Runner ----------
+def warm_cache(kinds: List[str] = KINDS, workers: int = 8, max_attempts: int = 3, force: bool = False) -> Dict:
+    skill_map = load_skill_map()
+    skills = catalog_skills(skill_map)
+    roles = sorted(skill_map)
+    kinds = list(kinds)
+    if "graph" in kinds and SKILL_GRAPH_OFFLINE:
+        logger.warning("⚠️ SKILL_GRAPH_OFFLINE=1: skipping graph metadata.")
+        kinds.remove("graph")
+
+    store = get_content_store()
+    before = coverage(kinds, skills, roles)
+    uncached = {kind: [n for n in (roles if kind == "roles" else skills) if n not in before[kind]] for kind in kinds}
+    checkpoint = store.get_many(CHECKPOINT_NAMESPACE, [f"{k}:{n}" for k, names in uncached.items() for n in names])
+
+    def attempts(kind: str, name: str) -> int:
+        return 0 if force else checkpoint.get(f"{kind}:{name}", {}).get("attempts", 0)
+
+    # Names that failed max_attempts earlier runs are left out until --force
+    todo = {kind: [n for n in names if attempts(kind, n) < max_attempts] for kind, names in uncached.items()}
+    skipped = sum(len(uncached[k]) - len(todo[k]) for k in kinds)
+    pending = build_items(todo)
+    logger.info(f"🔥 Warming {len(pending)} items ({len(skills)} skills, {len(roles)} roles, kinds: {', '.join(kinds)})"
+                + (f", skipping {skipped} that keep failing (use --force)" if skipped else ""))
+
+    generated = {kind: 0 for kind in KINDS}
+    failed = {kind: [] for kind in KINDS}
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(work): (kind, names) for kind, names, work in pending}
+        for done_count, future in enumerate(as_completed(futures), 1):
+            kind, names = futures[future]
+            try:
+                ok = set(future.result())
+            except Exception as e:
+                logger.warning(f"❌ {kind} item failed for {', '.join(names)}: {e}")
+                ok = set()
+            now = time.time()
+            store.put_many(CHECKPOINT_NAMESPACE, {
+                f"{kind}:{name}": {
+                    "status": "done" if name in ok else "failed", "at": now,
+                    "attempts": 0 if name in ok else attempts(kind, name) + 1
+                }
+                for name in names
+            })
+            generated[kind] += len(ok)
+            failed[kind] += [name for name in names if name not in ok]
+            if done_count % max(1, len(futures) // 10) == 0 or done_count == len(futures):
+                logger.info(f"⏳ {done_count}/{len(futures)} items done")
+
+    after = coverage(kinds, skills, roles)
+    totals = {"learning": len(skills), "graph": len(skills), "roles": len(roles)}
+    return {
+        "elapsed_s": round(time.time() - start, 1),
+        "coverage": {
+            kind: {
+                "total": totals[kind],
+                "covered": len(after[kind]),
+                "percent": round(100 * len(after[kind]) / totals[kind], 1) if totals[kind] else 100.0,
+                "generated": generated[kind],
+                "failed": sorted(failed[kind]),
+                "skipped": len(uncached[kind]) - len(todo[kind]),
+            }
+            for kind in kinds
+        },
+        "providers": provider_stats(),
+        "single_flight": single_flight_stats()
+    }
+
+
+def parse_rate(value: str) -> Tuple[str, float]:
+    provider, _, per_minute = value.partition("=")
+    if not provider or not per_minute:
+        raise argparse.ArgumentTypeError("Use PROVIDER=REQUESTS_PER_MINUTE, e.g. openrouter=60")
+    return provider.strip(), float(per_minute)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate LLM content for every skill and role in skill_map.json")
+    parser.add_argument("--only", nargs="+", choices=KINDS, default=list(KINDS), help="Content kinds to warm")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent items")
+    parser.add_argument("--rate", type=parse_rate, action="append", default=[],
+                        help="Per-provider cap, PROVIDER=REQUESTS_PER_MINUTE (repeatable)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Runs an item may fail before it is skipped")
+    parser.add_argument("--force", action="store_true", help="Ignore the checkpoint and retry every uncached item")
+    parser.add_argument("--report", help="Also write the coverage report to this JSON file")
+    args = parser.parse_args()
+
+    for provider, per_minute in args.rate:
+        set_rate_limit(provider, per_minute)
+
+    report = warm_cache(args.only, args.workers, args.max_attempts, args.force)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)